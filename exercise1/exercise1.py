@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 async def main():
     # 1. Create a TCP container
@@ -25,7 +26,7 @@ async def main():
     async with mango.activate(container):
         await container.send_message("Message after activation!", agent.addr)
         # Now the agent prints the received message
-        await asyncio.sleep(0.2)  # Allow message to process
+        await tasks_complete_or_sleeping(container)  # Until the message is processed
 
 if __name__ == "__main__":
     asyncio.run(main())
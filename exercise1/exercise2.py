@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 class PingPongAgent(mango.Agent):
     def __init__(self):
@@ -45,7 +46,7 @@ async def main():
     async with mango.activate(container):
         # Start BOTH agents with initial messages
         await agent1.send_message("Start ping!", agent2.addr)
-        await asyncio.sleep(2)  # Wait for communication to complete
+        await tasks_complete_or_sleeping(container)  # Until the exchange has finished
     
     print(f"Final counts - Agent1: {agent1.message_count}, Agent2: {agent2.message_count}")
 
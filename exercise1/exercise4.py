@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 class FibonacciAgent(mango.Agent):
     def __init__(self):
@@ -59,7 +60,7 @@ async def main():
     
     async with mango.activate(container):
         await container.send_message("START", agent1.addr)
-        await asyncio.sleep(2)
+        await tasks_complete_or_sleeping(container)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 # Reflexive Agent: Immediate, predetermined response
 class ReflexiveAgent(mango.Agent):
@@ -44,12 +45,13 @@ async def main():
         await container.send_message("How are you?", reflex.addr)
         await container.send_message("Weather?", reflex.addr)
         
-        await asyncio.sleep(0.5)
+        await tasks_complete_or_sleeping(container)
         
         print("\nTesting Deliberative Agent:")
         await container.send_message("First", deliberative.addr)
         await container.send_message("Second", deliberative.addr) 
         await container.send_message("Third", deliberative.addr)
+        await tasks_complete_or_sleeping(container)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
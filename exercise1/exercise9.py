@@ -1,13 +1,19 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 import random
 
 class HouseAgent(mango.Agent):
+    def __init__(self, rng=None):
+        super().__init__()
+        # Own random stream (seed or random.Random) for reproducible runs
+        self.rng = rng if isinstance(rng, random.Random) else random.Random(rng)
+
     def handle_message(self, content, meta):
         if content == "price_announcement":
-            price = random.uniform(0.12, 0.18)
-            production = random.randint(0, 10)
-            consumption = random.randint(3, 7)
+            price = self.rng.uniform(0.12, 0.18)
+            production = self.rng.randint(0, 10)
+            consumption = self.rng.randint(3, 7)
             balance = production - consumption
             
             if balance > 0:
@@ -17,11 +23,12 @@ class HouseAgent(mango.Agent):
             else:
                 print(f"House: Balanced")
 
-async def main():
+async def main(seed=None):
     container = mango.create_tcp_container(('127.0.0.1', 5555))
     
-    # Create 3 house agents
-    houses = [HouseAgent() for _ in range(3)]
+    # Create 3 house agents, each with its own stream derived from seed
+    rng = random.Random(seed)
+    houses = [HouseAgent(rng=random.Random(rng.getrandbits(64))) for _ in range(3)]
     for house in houses:
         container.register(house)
     
@@ -32,7 +39,7 @@ async def main():
             print(f"\nRound {round + 1}:")
             for house in houses:
                 await container.send_message("price_announcement", house.addr)
-            await asyncio.sleep(0.5)
+            await tasks_complete_or_sleeping(container)
 
     print("\n=== Simulation Complete ===")
     print("This demonstrates how agents can represent autonomous energy producers/consumers")
@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 class SimpleAgent(mango.Agent):
     def __init__(self):
@@ -30,7 +31,7 @@ async def main():
         for i, agent in enumerate(agents):
             await container.send_message("your_id", agent.addr, sender_id=i)
         
-        await asyncio.sleep(0.5)
+        await tasks_complete_or_sleeping(container)
         
         # Step 2: Create Small World topology with k=2
         # Each agent connects to 2 neighbors on each side (total 4 connections)
@@ -42,7 +43,7 @@ async def main():
                 # Agent i informs this neighbor
                 await container.send_message("neighbor_info", agents[neighbor_idx].addr, sender_id=i)
         
-        await asyncio.sleep(1)
+        await tasks_complete_or_sleeping(container)
         
         # Results
         print("\n=== Small World Topology Results ===")
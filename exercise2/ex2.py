@@ -1,5 +1,12 @@
 import asyncio
+import os
+import sys
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
+
+# Bulk-send helper lives in exercise3
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exercise3'))
+from bulk_send import send_bulk
 
 class SimpleAgent(mango.Agent):
     def __init__(self):
@@ -29,22 +36,23 @@ async def main():
     
     async with mango.activate(container):
         # Step 1: Assign IDs to all agents
-        for i, agent in enumerate(agents):
-            await container.send_message("your_id", agent.addr, sender_id=i)
+        await send_bulk(container, [("your_id", agent.addr, {'sender_id': i})
+                                    for i, agent in enumerate(agents)])
         
-        await asyncio.sleep(0.5)
+        await tasks_complete_or_sleeping(container)
         
         # Step 2: Create ring topology - each agent informs its neighbors
+        wiring = []
         for i in range(10):
             left_neighbor = agents[(i - 1) % 10]
             right_neighbor = agents[(i + 1) % 10]
             
-            # Agent i informs left neighbor
-            await container.send_message("neighbor_info", left_neighbor.addr, sender_id=i)
-            # Agent i informs right neighbor
-            await container.send_message("neighbor_info", right_neighbor.addr, sender_id=i)
+            # Agent i informs left and right neighbor
+            wiring.append(("neighbor_info", left_neighbor.addr, {'sender_id': i}))
+            wiring.append(("neighbor_info", right_neighbor.addr, {'sender_id': i}))
+        await send_bulk(container, wiring)
         
-        await asyncio.sleep(1)
+        await tasks_complete_or_sleeping(container)
         
         # Results
         print("\n=== Final State ===")
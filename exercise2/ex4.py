@@ -1,5 +1,6 @@
 import asyncio
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 # Reusing the same SimpleAgent class from my Exercise 2
 class SimpleAgent(mango.Agent):
@@ -34,7 +35,7 @@ async def main():
         for i, agent in enumerate(agents):
             await container.send_message("your_id", agent.addr, sender_id=i)
         
-        await asyncio.sleep(0.5)
+        await tasks_complete_or_sleeping(container)
         
         # Create Small World connections (k=2)
         n = 10
@@ -55,7 +56,7 @@ async def main():
         
         print(f"Total connections made: {connections_made}")
         
-        await asyncio.sleep(1)
+        await tasks_complete_or_sleeping(container)
         
         # Verify results
         print("\n=== Verification ===")
@@ -1,6 +1,7 @@
 import asyncio
 import networkx as nx
 import mango
+from mango.util.termination_detection import tasks_complete_or_sleeping
 
 class SimpleAgent(mango.Agent):
     def __init__(self, name):
@@ -34,7 +35,7 @@ async def main():
     print("Exercise 8: Using mango.custom_topology with NetworkX")
     
     async with mango.activate(container):
-        await asyncio.sleep(1)
+        await tasks_complete_or_sleeping(container)
         print("✓ Topology communication complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import mango
+
+# Transports compared:
+#   tcp       - one TCP container; messages between its agents never touch
+#               the socket or the codec, they are handed over by reference
+#   tcp-split - agents split over two TCP containers, every hop crosses them
+TRANSPORTS = ('tcp', 'tcp-split')
+
+
+class RelayAgent(mango.Agent):
+    """Forwards every token to its right neighbor until it has run out of hops."""
+    def __init__(self):
+        super().__init__()
+        self.next_addr = None
+        self.received = 0
+        self.tracker = None
+
+    def handle_message(self, content, meta):
+        self.received += 1
+        self.tracker.hop_done()
+        if content > 1:
+            self.schedule_instant_message(content - 1, self.next_addr)
+
+
+class HopTracker:
+    """Sets done_event once the expected number of hops has been delivered."""
+    def __init__(self, expected):
+        self.remaining = expected
+        self.done_event = asyncio.Event()
+
+    def hop_done(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done_event.set()
+
+
+def create_containers(transport):
+    if transport == 'tcp':
+        return [mango.create_tcp_container(('127.0.0.1', 5555))]
+    return [mango.create_tcp_container(('127.0.0.1', 5555)),
+            mango.create_tcp_container(('127.0.0.1', 5556))]
+
+
+async def measure_transport(transport, num_agents=100, num_tokens=50, hops=200):
+    """
+    Ring of relay agents passing num_tokens tokens hops times each.
+
+    In 'tcp-split' even and odd agents live in different containers, so
+    every hop crosses the container boundary.
+
+    Returns:
+        messages per second
+    """
+    containers = create_containers(transport)
+    agents = [containers[i % len(containers)].register(RelayAgent())
+              for i in range(num_agents)]
+    tracker = HopTracker(num_tokens * hops)
+    for i, agent in enumerate(agents):
+        agent.next_addr = agents[(i + 1) % num_agents].addr
+        agent.tracker = tracker
+
+    async with mango.activate(*containers):
+        start = time.perf_counter()
+        for k in range(num_tokens):
+            sender = agents[k * num_agents // num_tokens - 1]
+            sender.schedule_instant_message(hops, sender.next_addr)
+        await tracker.done_event.wait()
+        elapsed = time.perf_counter() - start
+
+    return num_tokens * hops / elapsed
+
+
+async def main():
+    print("=== Transport Benchmark: messages/second ===")
+    print(f"{'Transport':>10} {'Agents':>7} {'Messages':>9} {'msg/s':>10}")
+
+    num_tokens, hops = 50, 200
+    for num_agents in (100, 1000):
+        for transport in TRANSPORTS:
+            rate = await measure_transport(transport, num_agents, num_tokens, hops)
+            print(f"{transport:>10} {num_agents:7d} {num_tokens * hops:9d} {rate:10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
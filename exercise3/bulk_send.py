@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Dict, Iterable, Tuple
+
+from mango import Agent, AgentAddress
+
+# Agent id of the BulkReceiver in every container that accepts bulk frames
+BULK_AID = 'bulk'
+
+
+class BulkReceiver(Agent):
+    """Unpacks bulk frames and hands each message to its local receiver."""
+    def __init__(self, container):
+        super().__init__()
+        self.container = container
+
+    def handle_message(self, content, meta):
+        for receiver_id, payload, extra_meta in content['bulk']:
+            message_meta = dict(extra_meta)
+            message_meta['sender_addr'] = meta.get('sender_addr')
+            message_meta['receiver_id'] = receiver_id
+            message_meta['network_protocol'] = meta.get('network_protocol')
+            # Same path the container uses for messages between its own agents
+            self.container._send_internal_message(
+                payload, receiver_id, default_meta=message_meta)
+
+
+def enable_bulk_receive(container):
+    """Register the BulkReceiver that lets container accept bulk frames."""
+    return container.register(BulkReceiver(container), suggested_aid=BULK_AID)
+
+
+async def send_bulk(sender, messages: Iterable[Tuple]) -> bool:
+    """
+    Send many messages with one frame per destination container.
+
+    Messages for the sender's own container are delivered directly; all
+    messages for another container are packed into a single frame for
+    its BulkReceiver (see enable_bulk_receive), which delivers them in
+    order with their own meta. All groups are sent concurrently.
+
+    Args:
+        sender: Sending Agent, or a Container for messages from main()
+        messages: (content, receiver_addr) or (content, receiver_addr,
+                  meta kwargs) tuples, e.g. ("your_id", addr, {'sender_id': 3})
+
+    Returns:
+        True if every local send and every frame was accepted
+    """
+    is_agent = isinstance(sender, Agent)
+    own_addr = sender.addr.protocol_addr if is_agent else sender.addr
+
+    local_sends = []
+    frames: Dict[Any, list] = {}
+    for message in messages:
+        content, receiver_addr = message[0], message[1]
+        extra_meta = message[2] if len(message) > 2 else {}
+        if receiver_addr.protocol_addr == own_addr:
+            local_sends.append(sender.send_message(content, receiver_addr, **extra_meta))
+        else:
+            meta = dict(extra_meta)
+            if is_agent:
+                meta.setdefault('sender_id', sender.aid)
+            key = receiver_addr.protocol_addr
+            key = tuple(key) if isinstance(key, list) else key
+            frames.setdefault(key, []).append([receiver_addr.aid, content, meta])
+
+    frame_sends = [
+        sender.send_message({'bulk': batch}, AgentAddress(protocol_addr, BULK_AID))
+        for protocol_addr, batch in frames.items()
+    ]
+    results = await asyncio.gather(*local_sends, *frame_sends)
+    return all(result is not False for result in results)
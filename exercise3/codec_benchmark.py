@@ -0,0 +1,74 @@
+import timeit
+
+import numpy as np
+from mango import AgentAddress
+from mango.messages.codecs import JSON
+from mango.messages.message import MangoMessage
+
+from ex1 import MyMessage
+from msgpack_codec import MsgPack
+
+
+def make_codecs():
+    """JSON and MsgPack codecs with MyMessage registered, as in ex1.main()."""
+    codecs = {'JSON': JSON(), 'MsgPack': MsgPack()}
+    for codec in codecs.values():
+        codec.add_serializer(*MyMessage.__serializer__())
+    return codecs
+
+
+def wrap(content):
+    """Wrap content like a TCP container does before encoding."""
+    meta = {
+        'sender_id': 'agent0',
+        'sender_addr': ('127.0.0.1', 5555),
+        'receiver_id': 'agent0',
+        'network_protocol': 'tcp',
+    }
+    return MangoMessage(content, meta)
+
+
+def benchmark(codec, message, number=2000):
+    """
+    Returns:
+        (encoded size in bytes, encode+decode time per message in µs)
+    """
+    encoded = codec.encode(message)
+    seconds = timeit.timeit(lambda: codec.decode(codec.encode(message)), number=number)
+    return len(encoded), seconds / number * 1e6
+
+
+def main():
+    codecs = make_codecs()
+    lambdas = np.random.default_rng(0).uniform(15, 20, 1000)
+
+    # The three message kinds of ex1.py, plus a numerical payload as sent
+    # by the dispatch agents (JSON needs it as a list)
+    messages = {
+        'string': ("Hello from a string!", None),
+        'dict': ({"message": "This is a dictionary"}, None),
+        'MyMessage': (MyMessage("This is a custom object", {"value": 42}), None),
+        'MyMessage + λ[1000]': (MyMessage("lambda", {"values": lambdas}),
+                                MyMessage("lambda", {"values": lambdas.tolist()})),
+    }
+
+    print("=== Codec Benchmark: bytes/message, encode+decode µs ===")
+    print(f"{'Message':>20} {'Codec':>8} {'Bytes':>8} {'µs':>9}")
+    for name, (content, json_content) in messages.items():
+        for codec_name, codec in codecs.items():
+            if codec_name == 'JSON' and json_content is not None:
+                message = wrap(json_content)
+            else:
+                message = wrap(content)
+            size, micros = benchmark(codec, message)
+            print(f"{name:>20} {codec_name:>8} {size:8d} {micros:9.2f}")
+
+    # Round trip keeps arrays intact
+    decoded = codecs['MsgPack'].decode(codecs['MsgPack'].encode(
+        wrap(MyMessage("lambda", {"values": lambdas}))))
+    print(f"\nMsgPack array round trip exact: "
+          f"{np.array_equal(decoded.content.data['values'], lambdas)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from mango import Agent, AgentAddress, create_tcp_container, json_serializable,
 from mango.messages.codecs import JSON
 from typing import Dict, Any, Optional
 
+from bulk_send import enable_bulk_receive, send_bulk
+
 # 1. Self-defined message class (this part is correct)
 @json_serializable
 class MyMessage:
@@ -53,15 +55,23 @@ class SenderAgent(Agent):
             MyMessage("This is a custom object", {"value": 42})
         ]
 
-        for msg in messages_to_send:
-            await self.send_message(content=msg, receiver_addr=self.receiver_addr)
+        # One frame for all messages to the receiver's container
+        await send_bulk(self, [(msg, self.receiver_addr) for msg in messages_to_send])
         
         print("Sender: All messages sent.")
 
 # 4. The main function that sets up the containers and agents
-async def main():
-    """Sets up and runs the multi-container agent system."""
-    codec = JSON()
+async def main(codec_name: str = 'json'):
+    """
+    Sets up and runs the multi-container agent system.
+
+    codec_name='msgpack' uses the binary MsgPack codec instead of JSON.
+    """
+    if codec_name == 'msgpack':
+        from msgpack_codec import MsgPack
+        codec = MsgPack()
+    else:
+        codec = JSON()
     codec.add_serializer(*MyMessage.__serializer__())
 
     c1 = create_tcp_container(addr=('127.0.0.1', 5555), codec=codec)
@@ -74,6 +84,7 @@ async def main():
     a2 = c2.register(agent=receiver_agent)
 
     a1.receiver_addr = a2.addr
+    enable_bulk_receive(c2)
 
     async with activate(c1, c2):
         print("Main: Containers are active. Waiting for receiver to signal completion...")
@@ -21,8 +21,10 @@ class ConstraintAgent(Agent):
     """
     An agent that tries to choose a color different from its neighbors.
     """
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
         super().__init__()
+        # Own random stream (seed or random.Random) for reproducible runs
+        self.rng = rng if isinstance(rng, random.Random) else random.Random(rng)
         self.color: Optional[Color] = None
         self.neighbors: Dict[str, AgentAddress] = {}
         self.neighbor_colors: Dict[str, Color] = {}
@@ -73,13 +75,14 @@ class ConstraintAgent(Agent):
     async def change_color(self):
         """Chooses a new valid color and broadcasts the change."""
         current_neighbor_colors = set(self.neighbor_colors.values())
-        available_colors = list(ALL_COLORS - current_neighbor_colors)
+        # Sort so the choice does not depend on set iteration order
+        available_colors = sorted(ALL_COLORS - current_neighbor_colors, key=lambda c: c.value)
 
         if not available_colors:
             print(f"CRITICAL: Agent {self.aid} has no valid colors to choose from!")
             return
 
-        new_color = random.choice(available_colors)
+        new_color = self.rng.choice(available_colors)
         print(f"Agent {self.aid} is CHANGING from {self.color} to {new_color}.")
         self.color = new_color
         
@@ -88,17 +91,20 @@ class ConstraintAgent(Agent):
         await self.share_color()
 
 
-async def main():
+async def main(seed: Optional[int] = None):
     """Sets up the container, agents, topology, and runs the simulation."""
+    # One seed drives the initial colors and an independent stream per agent
+    rng = random.Random(seed)
+
     container = create_tcp_container(addr=('127.0.0.1', 5555))
 
-    agents = [ConstraintAgent() for _ in range(3)]
+    agents = [ConstraintAgent(rng=random.Random(rng.getrandbits(64))) for _ in range(3)]
     a0, a1, a2 = [container.register(agent=a) for a in agents]
 
     # Initialize with a random INVALID combination (guaranteed conflict)
-    initial_colors = random.sample(list(Color), 2)
+    initial_colors = rng.sample(list(Color), 2)
     color_assignments = [initial_colors[0], initial_colors[0], initial_colors[1]]
-    random.shuffle(color_assignments)
+    rng.shuffle(color_assignments)
     a0.color, a1.color, a2.color = color_assignments
 
     print("--- Initial State ---")
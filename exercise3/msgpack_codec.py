@@ -0,0 +1,49 @@
+import msgpack
+import numpy as np
+from mango.messages.codecs import Codec
+from mango.messages.message import (
+    ACLMessage,
+    AgentAddress,
+    MangoMessage,
+    Performatives,
+    enum_serializer,
+)
+
+
+class MsgPack(Codec):
+    """
+    Binary codec using msgpack, a drop-in replacement for mango's JSON codec.
+
+    Registered classes (e.g. via @json_serializable) use the same
+    serializers as with JSON. NumPy arrays are written as their raw
+    buffer plus dtype and shape, and decoded with np.frombuffer on the
+    received bytes, so they are never converted element by element.
+    Decoded arrays are read-only views of the message.
+    """
+    def __init__(self):
+        super().__init__()
+        self.add_serializer(*ACLMessage.__json_serializer__())
+        self.add_serializer(*MangoMessage.__json_serializer__())
+        self.add_serializer(*AgentAddress.__serializer__())
+        self.add_serializer(*enum_serializer(Performatives))
+
+    def encode(self, data):
+        return msgpack.packb(data, default=self._default)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, object_hook=self._object_hook,
+                               strict_map_key=False)
+
+    def _default(self, obj):
+        if isinstance(obj, np.ndarray):
+            buffer = memoryview(np.ascontiguousarray(obj)).cast('B')
+            return {'__ndarray__': [obj.dtype.str, list(obj.shape), buffer]}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return self.serialize_obj(obj)
+
+    def _object_hook(self, obj):
+        if '__ndarray__' in obj:
+            dtype, shape, buffer = obj['__ndarray__']
+            return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+        return self.deserialize_obj(obj)
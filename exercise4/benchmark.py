@@ -0,0 +1,314 @@
+"""
+Benchmark: Pyomo vs. Multi-Agent Dispatch
+Runs the dispatch approaches on synthetic instances of increasing size
+(units × time steps) and records wall time, peak memory, optimality gap
+and feasibility as JSON or CSV, so scaling regressions can be tracked
+across versions.
+
+The consensus dispatcher of exercise5 (task3.distributed_economic_dispatch)
+is not benchmarked. Its penalty step λ += ρ·(P_i - demand/N) feeds a power
+surplus back as a higher λ and hence even more power, so it only meets
+the demand when clipped units happen to add up to it. It has no battery
+model either. On these instances, with plant costs of 50-70 €/MWh, no
+period is balanced to FEASIBILITY_TOL within 2000 iterations for any
+tested ρ, even when λ starts at the mean plant cost. Its cost column
+would carry no information.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import task2
+import task4
+
+# Random stream helpers live in exercise5
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'exercise5'))
+from task3 import spawn_rngs  # noqa: E402
+
+
+# Problem sizes (number of plants, number of time steps)
+DEFAULT_SIZES = [(2, 8), (4, 24), (8, 96), (16, 96), (32, 192)]
+
+# Power balance tolerance for counting a schedule as feasible (MW)
+FEASIBILITY_TOL = 1e-3
+
+RESULT_FIELDS = ('method', 'num_plants', 'num_steps', 'seed', 'stream', 'wall_time',
+                 'peak_memory_mb', 'cost', 'reference_cost', 'gap',
+                 'max_imbalance', 'feasible', 'error')
+
+
+def generate_instance(num_plants, num_steps, seed=None):
+    """
+    Random dispatch instance with one battery.
+    
+    Plant costs are spread around 60 €/MWh, demand follows a daily-shaped
+    profile up to the combined plant capacity, with a few peaks above it
+    that only the battery can cover.
+    
+    Args:
+        num_plants: Number of power plants
+        num_steps: Number of 15-minute time steps
+        seed: Seed or numpy Generator for the random draws
+    
+    Returns:
+        dict with 'demand' (list), 'plants' and 'batteries' tables
+    """
+    rng = np.random.default_rng(seed)
+    capacities = rng.uniform(4.0, 12.0, num_plants).round(1)
+    costs = rng.uniform(50.0, 70.0, num_plants).round(1)
+    plants = {
+        f'g{i + 1}': {'capacity': float(c), 'cost': float(p)}
+        for i, (c, p) in enumerate(zip(capacities, costs))
+    }
+    
+    total = capacities.sum()
+    battery = {
+        'capacity': round(0.25 * total, 1),
+        'power_limit': round(0.15 * total, 1),
+        'initial_soc': round(0.1 * total, 1),
+        'cost': 32.0
+    }
+    
+    # Daily shape plus noise, occasional peaks above plant capacity
+    phase = 2 * np.pi * np.arange(num_steps) / 96
+    shape = 0.55 - 0.3 * np.cos(phase) + rng.normal(0.0, 0.08, num_steps)
+    demand = np.clip(shape, 0.05, 0.95) * total
+    peaks = rng.random(num_steps) < 0.05
+    demand[peaks] = total + rng.uniform(0.1, 0.5, peaks.sum()) * battery['power_limit']
+    
+    return {
+        'demand': demand.round(2).tolist(),
+        'plants': plants,
+        'batteries': {'bat': battery}
+    }
+
+
+def measure(func, *args, **kwargs):
+    """
+    Call func and record its wall time.
+    
+    Output printed by func is discarded.
+    
+    Returns:
+        (result, wall time in s)
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def measure_memory(func, *args, **kwargs):
+    """
+    Call func and record its peak Python heap allocation.
+    
+    Memory is traced with tracemalloc, so external solver processes are
+    not included. Tracing slows every allocation down considerably, so
+    this is a separate run from the timed ones in measure().
+    
+    Returns:
+        peak memory in MB
+    """
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def schedule_imbalance(demand, plant_schedules, charge, discharge, soc, battery):
+    """
+    Largest power balance or battery limit violation of a schedule (MW).
+    
+    Args:
+        demand: Demand per time step (T,)
+        plant_schedules: Plant output (P, T)
+        charge, discharge, soc: Battery schedules (T,)
+        battery: Battery parameters (capacity, power_limit, ...)
+    """
+    demand = np.asarray(demand, dtype=float)
+    balance = np.sum(plant_schedules, axis=0) + discharge - charge - demand
+    violations = [
+        np.abs(balance).max(),
+        np.maximum(np.max(charge) - battery['power_limit'], 0.0),
+        np.maximum(np.max(discharge) - battery['power_limit'], 0.0),
+        np.maximum(-np.min(soc), 0.0),
+        np.maximum(np.max(soc) - battery['capacity'], 0.0),
+        np.maximum(-np.min(plant_schedules), 0.0),
+    ]
+    return float(max(violations))
+
+
+def run_pyomo(instance, solver=None):
+    """Pyomo model from task2 (build + solve)."""
+    dispatch = task2.EconomicDispatchModel(instance['demand'], instance['plants'],
+                                           instance['batteries'], solver=solver)
+    solution, _ = dispatch.solve()
+    if solution is None:
+        raise RuntimeError("solver did not report an ok status")
+    
+    steps = range(1, len(instance['demand']) + 1)
+    battery = solution['batteries']['bat']
+    plants = np.array([[solution['plants'][g][t] for t in steps]
+                       for g in instance['plants']])
+    charge, discharge, soc = (np.array([battery[key][t] for t in steps])
+                              for key in ('p_charge', 'p_discharge', 'soc'))
+    imbalance = schedule_imbalance(instance['demand'], plants, charge, discharge,
+                                   soc, instance['batteries']['bat'])
+    return solution['total_cost'], imbalance
+
+
+def run_distributed(instance, method='negotiation'):
+    """
+    DistributedCoordinator from task4.
+    
+    Args:
+        method: 'negotiation' (price-signal rounds), or 'greedy' /
+                'lookahead' for the one-shot merit-order battery modes
+    """
+    plant_agents = [
+        task4.PlantAgent(plant_id=i, capacity=p['capacity'], cost=p['cost'])
+        for i, p in enumerate(instance['plants'].values(), start=1)
+    ]
+    bat = instance['batteries']['bat']
+    battery = task4.BatteryAgent(capacity=bat['capacity'], power_limit=bat['power_limit'],
+                                 initial_soc=bat['initial_soc'], cost=bat['cost'])
+    coordinator = task4.DistributedCoordinator(instance['demand'], plant_agents, battery)
+    
+    if method == 'negotiation':
+        solution, cost, _ = coordinator.run_negotiation(rho=2.0)
+    else:
+        solution, cost = coordinator.run_optimization(battery_mode=method)
+    if solution is None:
+        return cost, float('inf')
+    
+    steps = range(1, len(instance['demand']) + 1)
+    plants = np.array([[p['schedule'][t] for t in steps] for p in solution['plants']])
+    charge, discharge, soc = (np.array([solution['battery'][key][t] for t in steps])
+                              for key in ('charge', 'discharge', 'soc'))
+    imbalance = schedule_imbalance(instance['demand'], plants, charge, discharge,
+                                   soc, bat)
+    return cost, imbalance
+
+
+METHODS = {
+    'pyomo': run_pyomo,
+    'mas_negotiation': lambda instance: run_distributed(instance, 'negotiation'),
+    'mas_lookahead': lambda instance: run_distributed(instance, 'lookahead'),
+}
+
+
+def run_benchmark(sizes=None, methods=None, seed=0, repeats=1):
+    """
+    Run every method on one instance per size.
+    
+    The reference cost is the LP optimum (task2 linprog backend).
+    
+    Args:
+        sizes: List of (num_plants, num_steps)
+        methods: Method names from METHODS (None = all)
+        seed: Benchmark seed; size k draws its instance from the k-th
+              independent stream of spawn_rngs(seed, len(sizes))
+        repeats: Timed runs per method; the fastest wall time is reported.
+                 Peak memory comes from one extra traced run.
+    
+    Returns:
+        List of result records (dicts with RESULT_FIELDS)
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    methods = list(METHODS) if methods is None else methods
+    rngs = spawn_rngs(seed, len(sizes))
+    records = []
+    
+    for k, (num_plants, num_steps) in enumerate(sizes):
+        instance = generate_instance(num_plants, num_steps, rngs[k])
+        lp = task2.solve_economic_dispatch_linprog(
+            instance['demand'], instance['plants'], instance['batteries'])
+        lp_cost = lp['total_cost'] if lp is not None else None
+        
+        for method in methods:
+            record = {'method': method, 'num_plants': num_plants,
+                      'num_steps': num_steps, 'seed': seed, 'stream': k,
+                      'reference_cost': lp_cost, 'error': None}
+            try:
+                runs = [measure(METHODS[method], instance) for _ in range(repeats)]
+                cost, imbalance = runs[0][0]
+                record['wall_time'] = min(run[1] for run in runs)
+                record['peak_memory_mb'] = measure_memory(METHODS[method], instance)
+                record['cost'] = cost
+                record['max_imbalance'] = imbalance
+                record['feasible'] = bool(imbalance <= FEASIBILITY_TOL)
+                # A cheaper infeasible schedule would show up as a negative gap
+                if record['feasible'] and lp_cost and np.isfinite(cost):
+                    record['gap'] = (cost - lp_cost) / abs(lp_cost)
+            except Exception as exc:
+                record['error'] = f"{type(exc).__name__}: {exc}"
+                record['feasible'] = False
+            records.append(record)
+            
+            gap = record.get('gap')
+            gap = f"{100 * gap:+7.3f}%" if gap is not None else f"{'n/a':>8}"
+            print(f"  {method:16s} {num_plants:3d} × {num_steps:4d}: "
+                  f"{record.get('wall_time', float('nan')):8.3f} s, "
+                  f"{record.get('peak_memory_mb', float('nan')):7.2f} MB, "
+                  f"gap {gap}, "
+                  f"{'feasible' if record['feasible'] else 'INFEASIBLE'}")
+    
+    return [{field: record.get(field) for field in RESULT_FIELDS} for record in records]
+
+
+def environment_info():
+    """Versions recorded next to the results for comparing runs."""
+    import pyomo
+    import scipy
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'pyomo': pyomo.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def write_results(records, path):
+    """Write records as CSV (.csv) or JSON with environment info (otherwise)."""
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, 'w') as f:
+            json.dump({'environment': environment_info(), 'results': records},
+                      f, indent=2)
+
+
+def main(output='benchmark_results.json', sizes=None, seed=0):
+    """Main function."""
+    
+    print("\n" + "="*70)
+    print("DISPATCH BENCHMARK: PYOMO vs MAS")
+    print("="*70 + "\n")
+    
+    records = run_benchmark(sizes, seed=seed)
+    write_results(records, output)
+    
+    print(f"\n✅ {len(records)} results written to {output}\n")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
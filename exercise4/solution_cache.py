@@ -0,0 +1,113 @@
+"""
+Content-addressed cache for dispatch solutions.
+Solutions are keyed by a hash of all inputs, so repeated solves with
+identical demand and unit parameters return instantly.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+
+def _to_builtin(obj):
+    """JSON fallback for NumPy scalars/arrays and other sequences."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Cannot hash input of type {type(obj).__name__}")
+
+
+class SolutionCache:
+    """
+    LRU cache of solutions in memory, with an optional on-disk store.
+
+    Keys come from make_key(), a SHA-256 of the canonical JSON of all
+    inputs. Stored and returned values are copies, so callers can modify
+    a solution without corrupting the cache.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        """
+        Args:
+            maxsize: Maximum number of solutions kept in memory
+            directory: Folder for the on-disk store (None = memory only)
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self._entries = OrderedDict()
+
+        # Counters for sizing the cache
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(*inputs):
+        """Hash all inputs (dicts, lists, numbers, arrays) into a key."""
+        canonical = json.dumps(inputs, sort_keys=True, default=_to_builtin)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Return a copy of the cached solution, or None on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._entries[key])
+
+        if self.directory is not None and os.path.exists(self._path(key)):
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+            self._remember(key, value)
+            self.hits += 1
+            self.disk_hits += 1
+            return copy.deepcopy(value)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a copy of a solution (and write it to disk if enabled)."""
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+
+        if self.directory is not None:
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f)
+            os.replace(tmp_path, self._path(key))
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop the in-memory entries and reset the counters."""
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self):
+        return len(self._entries)
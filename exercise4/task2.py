@@ -1,64 +1,150 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
 import pyomo.environ as pyo
+from scipy.optimize import linprog
+
+from solution_cache import SolutionCache
+
+
+# ============================================================================
+# DEFAULT PROBLEM DATA
+# ============================================================================
+
+# Demand target (MW) for each 15-minute time step
+DEFAULT_DEMAND = [16.0, 10.0, 18.0, 19.0, 10.0, 4.0, 16.0, 21.0]
+
+DEFAULT_DT = 0.25  # hours (15 minutes)
+
+# Power plants: capacity (MW), cost (€/MWh)
+DEFAULT_PLANTS = {
+    'g1': {'capacity': 10.0, 'cost': 60.0},   # Power Plant 1
+    'g2': {'capacity': 6.0, 'cost': 58.0},    # Power Plant 2
+}
+
+# Batteries: energy capacity (MWh), charge/discharge power limit (MW),
+# initial SoC (MWh), cost (€/MWh)
+DEFAULT_BATTERIES = {
+    'bat': {'capacity': 10.0, 'power_limit': 5.0, 'initial_soc': 1.0, 'cost': 32.0},
+}
+
+PLANT_FIELDS = ('capacity', 'cost')
+BATTERY_FIELDS = ('capacity', 'power_limit', 'initial_soc', 'cost')
+
+# Persistent interfaces tried first when no solver is given. Only APPSI
+# solvers qualify: they track changes to mutable Params automatically,
+# while the legacy *_persistent plugins need set_instance() and explicit
+# updates after every change.
+PERSISTENT_SOLVERS = ('appsi_highs', 'appsi_gurobi', 'appsi_cplex')
 
-def solve_economic_dispatch():
+
+def unit_table(units, fields):
+    """
+    Normalize unit data to {name: {field: value}}.
+    
+    Accepts a dict of dicts, a list of records with a 'name' key, or a
+    pandas DataFrame indexed by unit name.
+    """
+    if hasattr(units, 'to_dict'):
+        units = units.to_dict('index')
+    elif not isinstance(units, dict):
+        units = {record['name']: {k: v for k, v in record.items() if k != 'name'}
+                 for record in units}
+    
+    table = {}
+    for name, data in units.items():
+        missing = set(fields) - set(data)
+        if missing:
+            raise ValueError(f"Unit {name!r} is missing {sorted(missing)}")
+        table[name] = {field: float(data[field]) for field in fields}
+    return table
+
+
+def make_solver(solver=None):
+    """
+    Create a solver instance once so it can be reused for re-solves.
+    
+    Args:
+        solver: Solver name, or None to use the first available
+                persistent interface (falling back to GLPK)
+    """
+    if solver is not None:
+        return pyo.SolverFactory(solver)
+    for name in PERSISTENT_SOLVERS:
+        candidate = pyo.SolverFactory(name)
+        if candidate.available(exception_flag=False):
+            return candidate
+    return pyo.SolverFactory("glpk")
+
+
+def build_dispatch_model(num_timesteps, plants, batteries):
+    """
+    Build the economic dispatch LP for any set of plants and batteries.
+    
+    Variables and constraints are indexed over (unit, time), so the model
+    grows linearly with the number of units. All inputs are mutable
+    Params: demand, capacities, costs and initial SoC can be changed in
+    place and the model re-solved.
+    
+    Args:
+        num_timesteps: Horizon length
+        plants: Unit table {name: {'capacity', 'cost'}}
+        batteries: Unit table {name: {'capacity', 'power_limit',
+                   'initial_soc', 'cost'}}
+    """
     # FIRSTLY, We CREATE MODEL
     model = pyo.ConcreteModel(name="Economic_Dispatch")
     
     # ========================================================================
-    # Defining all PARAMETERS (Input Data)
+    # Defining all SETS and PARAMETERS (Input Data)
     
     # Time configuration
-    num_timesteps = 8
-    dt = 0.25  # hours (15 minutes)
     model.T = pyo.RangeSet(1, num_timesteps)
+    model.dt = pyo.Param(mutable=True, initialize=DEFAULT_DT)
+    
+    # Units
+    model.G = pyo.Set(initialize=list(plants), ordered=True, doc="Power plants")
+    model.B = pyo.Set(initialize=list(batteries), ordered=True, doc="Batteries")
     
     # Demand target (MW) for each time step
-    demand_data = {
-        1: 16.0,
-        2: 10.0,
-        3: 18.0,
-        4: 19.0,
-        5: 10.0,
-        6: 4.0,
-        7: 16.0,
-        8: 21.0
-    }
+    model.demand = pyo.Param(model.T, initialize=0.0, mutable=True,
+                            within=pyo.NonNegativeReals)
     
     # Power plant parameters
-    PP1_capacity = 10.0  # MW
-    PP1_cost = 60.0      # €/MWh
-    
-    PP2_capacity = 6.0   # MW
-    PP2_cost = 58.0      # €/MWh
+    model.plant_capacity = pyo.Param(model.G, mutable=True,
+                                     initialize={g: d['capacity'] for g, d in plants.items()})
+    model.plant_cost = pyo.Param(model.G, mutable=True,
+                                 initialize={g: d['cost'] for g, d in plants.items()})
     
     # Battery parameters
-    BAT_capacity = 10.0        # MWh (energy capacity)
-    BAT_power_limit = 5.0      # MW (power limit for charge/discharge)
-    BAT_initial_soc = 1.0      # MWh (10% of 10 MWh)
-    BAT_cost = 32.0            # €/MWh
-    
-    # Create Pyomo parameters
-    model.demand = pyo.Param(model.T, initialize=demand_data, 
-                            within=pyo.NonNegativeReals)
+    model.bat_capacity = pyo.Param(model.B, mutable=True,
+                                   initialize={b: d['capacity'] for b, d in batteries.items()})
+    model.bat_power_limit = pyo.Param(model.B, mutable=True,
+                                      initialize={b: d['power_limit'] for b, d in batteries.items()})
+    model.bat_initial_soc = pyo.Param(model.B, mutable=True,
+                                      initialize={b: d['initial_soc'] for b, d in batteries.items()})
+    model.bat_cost = pyo.Param(model.B, mutable=True,
+                               initialize={b: d['cost'] for b, d in batteries.items()})
     
     # ========================================================================
     # DEFINING DECISION VARIABLES
     # ========================================================================
     
     # Power plant generation (MW)
-    model.g1 = pyo.Var(model.T, domain=pyo.NonNegativeReals, 
-                       doc="Power Plant 1 output")
-    model.g2 = pyo.Var(model.T, domain=pyo.NonNegativeReals, 
-                       doc="Power Plant 2 output")
+    model.gen = pyo.Var(model.G, model.T, domain=pyo.NonNegativeReals, 
+                        doc="Power plant output")
     
     # Battery power (MW)
-    model.p_charge = pyo.Var(model.T, domain=pyo.NonNegativeReals, 
+    model.p_charge = pyo.Var(model.B, model.T, domain=pyo.NonNegativeReals, 
                             doc="Battery charging power")
-    model.p_discharge = pyo.Var(model.T, domain=pyo.NonNegativeReals, 
+    model.p_discharge = pyo.Var(model.B, model.T, domain=pyo.NonNegativeReals, 
                                doc="Battery discharging power")
     
     # Battery state of charge (MWh)
-    model.soc = pyo.Var(model.T, domain=pyo.NonNegativeReals, 
+    model.soc = pyo.Var(model.B, model.T, domain=pyo.NonNegativeReals, 
                        doc="Battery state of charge")
     
     # ========================================================================
@@ -71,66 +157,56 @@ def solve_economic_dispatch():
         At each time step, generation + battery discharge - battery charge
         must equal demand.
         """
-        return (m.g1[t] + m.g2[t] + m.p_discharge[t] - m.p_charge[t] 
+        return (sum(m.gen[g, t] for g in m.G) +
+                sum(m.p_discharge[b, t] - m.p_charge[b, t] for b in m.B)
                 == m.demand[t])
     
     model.PowerBalance = pyo.Constraint(model.T, rule=power_balance_rule,
                                        doc="Supply must meet demand")
     
     # Constraint 2: Generator Capacity Limits
-    def gen1_capacity_rule(m, t):
-        """Power Plant 1 cannot exceed 10 MW."""
-        return m.g1[t] <= PP1_capacity
-    
-    model.Gen1Capacity = pyo.Constraint(model.T, rule=gen1_capacity_rule)
+    def gen_capacity_rule(m, g, t):
+        """A power plant cannot exceed its capacity."""
+        return m.gen[g, t] <= m.plant_capacity[g]
     
-    def gen2_capacity_rule(m, t):
-        """Power Plant 2 cannot exceed 6 MW."""
-        return m.g2[t] <= PP2_capacity
-    
-    model.Gen2Capacity = pyo.Constraint(model.T, rule=gen2_capacity_rule)
+    model.GenCapacity = pyo.Constraint(model.G, model.T, rule=gen_capacity_rule)
     
     # Constraint 3: Battery Power Limits
-    def charge_limit_rule(m, t):
-        """Battery charging power cannot exceed 5 MW."""
-        return m.p_charge[t] <= BAT_power_limit
+    def charge_limit_rule(m, b, t):
+        """Battery charging power cannot exceed the power limit."""
+        return m.p_charge[b, t] <= m.bat_power_limit[b]
     
-    model.ChargeLimit = pyo.Constraint(model.T, rule=charge_limit_rule)
+    model.ChargeLimit = pyo.Constraint(model.B, model.T, rule=charge_limit_rule)
     
-    def discharge_limit_rule(m, t):
-        """Battery discharging power cannot exceed 5 MW."""
-        return m.p_discharge[t] <= BAT_power_limit
+    def discharge_limit_rule(m, b, t):
+        """Battery discharging power cannot exceed the power limit."""
+        return m.p_discharge[b, t] <= m.bat_power_limit[b]
     
-    model.DischargeLimit = pyo.Constraint(model.T, rule=discharge_limit_rule)
+    model.DischargeLimit = pyo.Constraint(model.B, model.T, rule=discharge_limit_rule)
     
     # Constraint 4: Battery State of Charge (SoC) Dynamics
-    def soc_dynamics_rule(m, t):
+    def soc_dynamics_rule(m, b, t):
         """
         SoC changes based on charging and discharging.
         Energy = Power × Time
         """
         if t == 1:
             # First time step: start from initial SoC
-            return m.soc[t] == BAT_initial_soc + dt * (m.p_charge[t] - m.p_discharge[t])
+            previous = m.bat_initial_soc[b]
         else:
             # Subsequent time steps: update from previous SoC
-            return m.soc[t] == m.soc[t-1] + dt * (m.p_charge[t] - m.p_discharge[t])
+            previous = m.soc[b, t-1]
+        return m.soc[b, t] == previous + m.dt * (m.p_charge[b, t] - m.p_discharge[b, t])
     
-    model.SoCDynamics = pyo.Constraint(model.T, rule=soc_dynamics_rule,
+    model.SoCDynamics = pyo.Constraint(model.B, model.T, rule=soc_dynamics_rule,
                                       doc="Battery energy balance")
     
-    # Constraint 5: Battery Capacity Limits
-    def soc_min_rule(m, t):
-        """Battery cannot be discharged below 0 MWh."""
-        return m.soc[t] >= 0.0
-    
-    model.SoCMin = pyo.Constraint(model.T, rule=soc_min_rule)
+    # Constraint 5: Battery Capacity Limits (SoC >= 0 via the domain)
+    def soc_max_rule(m, b, t):
+        """Battery cannot be charged above its energy capacity."""
+        return m.soc[b, t] <= m.bat_capacity[b]
     
-    def soc_max_rule(m, t):
-        """Battery cannot be charged above 10 MWh capacity."""
-        return m.soc[t] <= BAT_capacity
-    
-    model.SoCMax = pyo.Constraint(model.T, rule=soc_max_rule)
+    model.SoCMax = pyo.Constraint(model.B, model.T, rule=soc_max_rule)
     
     # ========================================================================
     # DEFINING OBJECTIVE FUNCTION
@@ -141,19 +217,403 @@ def solve_economic_dispatch():
         Minimize total operational cost over all time steps.
         Cost = time_duration × (generation_cost + battery_cost)
         """
-        return sum(
-            dt * (
-                PP1_cost * m.g1[t] +           # Cost of Plant 1
-                PP2_cost * m.g2[t] +           # Cost of Plant 2
-                BAT_cost * m.p_charge[t] +     # Cost of charging
-                BAT_cost * m.p_discharge[t]    # Cost of discharging
-            )
-            for t in m.T
-        )
+        generation_cost = sum(m.plant_cost[g] * m.gen[g, t]
+                              for g in m.G for t in m.T)
+        battery_cost = sum(m.bat_cost[b] * (m.p_charge[b, t] + m.p_discharge[b, t])
+                           for b in m.B for t in m.T)
+        return m.dt * (generation_cost + battery_cost)
     
     model.TotalCost = pyo.Objective(rule=total_cost_rule, sense=pyo.minimize,
                                    doc="Minimize operational cost")
     
+    return model
+
+
+class EconomicDispatchModel:
+    """
+    Reusable economic dispatch model for repeated re-solves.
+    
+    The Pyomo model and the solver are created once. update() changes the
+    mutable Params in place, and solve() re-solves the same structure; a
+    persistent solver then only receives the changed coefficients.
+    """
+    
+    def __init__(self, demand=None, plants=None, batteries=None, dt=DEFAULT_DT,
+                 solver=None):
+        """
+        Args:
+            demand: Demand per time step (MW), defines the horizon length
+            plants: Plant table (see unit_table), defaults to DEFAULT_PLANTS
+            batteries: Battery table, defaults to DEFAULT_BATTERIES
+            dt: Time step length (hours)
+            solver: Solver name (None = persistent interface if available)
+        """
+        demand = DEFAULT_DEMAND if demand is None else demand
+        self.num_timesteps = len(demand)
+        self.plants = unit_table(DEFAULT_PLANTS if plants is None else plants,
+                                 PLANT_FIELDS)
+        self.batteries = unit_table(DEFAULT_BATTERIES if batteries is None else batteries,
+                                    BATTERY_FIELDS)
+        self.model = build_dispatch_model(self.num_timesteps, self.plants, self.batteries)
+        self.solver = make_solver(solver)
+        self.update(demand=demand, dt=dt)
+    
+    def update(self, demand=None, plants=None, batteries=None, dt=None):
+        """
+        Set new input data in place (same horizon length and units).
+        
+        plants and batteries are partial tables, e.g.
+        batteries={'bat': {'initial_soc': 2.0}}.
+        """
+        m = self.model
+        if demand is not None:
+            if len(demand) != self.num_timesteps:
+                raise ValueError(f"Expected {self.num_timesteps} demand values, "
+                                 f"got {len(demand)}")
+            for t, value in enumerate(demand, start=1):
+                m.demand[t] = value
+        if dt is not None:
+            m.dt.set_value(dt)
+        for name, data in (plants or {}).items():
+            for field, value in data.items():
+                if field not in PLANT_FIELDS:
+                    raise ValueError(f"Unknown plant parameter: {field}")
+                getattr(m, f'plant_{field}')[name] = value
+                self.plants[name][field] = float(value)
+        for name, data in (batteries or {}).items():
+            for field, value in data.items():
+                if field not in BATTERY_FIELDS:
+                    raise ValueError(f"Unknown battery parameter: {field}")
+                getattr(m, f'bat_{field}')[name] = value
+                self.batteries[name][field] = float(value)
+    
+    def solve(self, tee=False, **kwargs):
+        """
+        Solve the current model.
+        
+        Solutions are only loaded into the model once the solver reports
+        an optimal termination, so infeasible or unbounded data returns
+        instead of raising (APPSI solvers raise when loading a solution
+        that does not exist).
+        
+        Args:
+            tee: Show solver output
+            **kwargs: Passed on to the solver, e.g. warmstart=True
+        
+        Returns:
+            (solution dict, solver result), solution is None unless the
+            solver found an optimal solution
+        """
+        result = self.solver.solve(self.model, tee=tee, load_solutions=False, **kwargs)
+        if (result.solver.status != pyo.SolverStatus.ok or
+                result.solver.termination_condition != pyo.TerminationCondition.optimal):
+            return None, result
+        self.model.solutions.load_from(result)
+        return extract_solution(self.model), result
+
+
+def _solution_dict(total_cost, plants, batteries, model=None):
+    """
+    Assemble a solution dict from per-unit schedules {name: {t: value}}.
+    
+    Besides 'plants' and 'batteries', every plant schedule is also
+    available under its own name, and with a single battery its
+    schedules are available as 'p_charge', 'p_discharge' and 'soc'
+    (the layout of the original two-plant, one-battery model).
+    """
+    solution = {
+        'total_cost': total_cost,
+        'plants': plants,
+        'batteries': batteries,
+    }
+    for name, schedule in plants.items():
+        solution.setdefault(name, schedule)
+    if len(batteries) == 1:
+        solution.update(next(iter(batteries.values())))
+    solution['model'] = model
+    return solution
+
+
+def extract_solution(model):
+    """Collect the solution values of a solved dispatch model."""
+    plants = {g: {t: pyo.value(model.gen[g, t]) for t in model.T} for g in model.G}
+    batteries = {
+        b: {key: {t: pyo.value(getattr(model, key)[b, t]) for t in model.T}
+            for key in ('p_charge', 'p_discharge', 'soc')}
+        for b in model.B
+    }
+    return _solution_dict(pyo.value(model.TotalCost), plants, batteries, model)
+
+
+def solve_economic_dispatch_linprog(demand=None, plants=None, batteries=None,
+                                    dt=DEFAULT_DT):
+    """
+    Solve the same dispatch LP as a sparse matrix problem with HiGHS.
+    
+    The LP is assembled directly as arrays instead of Pyomo rules. With
+    G plants and B batteries the variables are stacked as
+    x = [gen (G·T), p_charge (B·T), p_discharge (B·T), soc (B·T)], unit
+    by unit. Capacity, power and SoC limits become variable bounds:
+    
+        min  cᵀx   s.t.  A_eq x = b_eq,  lb <= x <= ub
+    
+    Args:
+        demand: Demand per time step (MW), defaults to DEFAULT_DEMAND
+        plants: Plant table (see unit_table), defaults to DEFAULT_PLANTS
+        batteries: Battery table, defaults to DEFAULT_BATTERIES
+        dt: Time step length (hours)
+        
+    Returns:
+        solution dict with the same keys as solve_economic_dispatch
+        ('model' is None), or None if HiGHS found no optimum
+    """
+    demand = np.asarray(DEFAULT_DEMAND if demand is None else demand, dtype=float)
+    plants = unit_table(DEFAULT_PLANTS if plants is None else plants, PLANT_FIELDS)
+    batteries = unit_table(DEFAULT_BATTERIES if batteries is None else batteries,
+                           BATTERY_FIELDS)
+    T, G, B = len(demand), len(plants), len(batteries)
+    
+    def field(table, name):
+        return np.array([data[name] for data in table.values()])
+    
+    I = sp.identity(T, format='csr')
+    ones_G = sp.csr_matrix(np.ones((1, G)))
+    ones_B = sp.csr_matrix(np.ones((1, B)))
+    I_B = sp.identity(B, format='csr')
+    # soc[t] - soc[t-1]
+    D = sp.diags([np.ones(T), -np.ones(T - 1)], [0, -1], format='csr')
+    
+    # Power balance: Σ gen + Σ p_discharge - Σ p_charge = demand
+    # SoC dynamics:  soc[t] - soc[t-1] - dt*p_charge + dt*p_discharge = 0
+    #                (soc[0] = initial SoC moves to the right-hand side)
+    Z_BG = sp.csr_matrix((B * T, G * T))
+    A_eq = sp.bmat([[sp.kron(ones_G, I), -sp.kron(ones_B, I), sp.kron(ones_B, I), None],
+                    [Z_BG, -dt * sp.kron(I_B, I), dt * sp.kron(I_B, I), sp.kron(I_B, D)]],
+                   format='csr')
+    b_soc = np.zeros((B, T))
+    b_soc[:, 0] = field(batteries, 'initial_soc')
+    b_eq = np.concatenate([demand, b_soc.ravel()])
+    
+    bat_cost = np.repeat(field(batteries, 'cost'), T)
+    c = dt * np.concatenate([np.repeat(field(plants, 'cost'), T), bat_cost, bat_cost,
+                             np.zeros(B * T)])
+    power_limit = np.repeat(field(batteries, 'power_limit'), T)
+    upper = np.concatenate([np.repeat(field(plants, 'capacity'), T), power_limit,
+                            power_limit, np.repeat(field(batteries, 'capacity'), T)])
+    bounds = np.column_stack([np.zeros(len(upper)), upper])
+    
+    res = linprog(c, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs')
+    if res.status != 0:
+        print("\n⚠️  WARNING: Solver did not find optimal solution!")
+        print(f"Solver Status: {res.message}")
+        return None
+    
+    gen = res.x[:G * T].reshape(G, T)
+    p_charge, p_discharge, soc = res.x[G * T:].reshape(3, B, T)
+    steps = range(1, T + 1)
+    
+    def schedule(values):
+        return dict(zip(steps, values.tolist()))
+    
+    plant_schedules = {g: schedule(gen[i]) for i, g in enumerate(plants)}
+    battery_schedules = {
+        b: {'p_charge': schedule(p_charge[i]), 'p_discharge': schedule(p_discharge[i]),
+            'soc': schedule(soc[i])}
+        for i, b in enumerate(batteries)
+    }
+    return _solution_dict(res.fun, plant_schedules, battery_schedules)
+
+
+def rolling_horizon_dispatch(demand_series, window=8, plants=None, batteries=None,
+                             dt=DEFAULT_DT, solver=None):
+    """
+    Receding-horizon dispatch over a long demand series.
+    
+    At every step the same model is re-optimized over the next `window`
+    intervals, only the first interval is committed, and its SoC becomes
+    the initial SoC of the next window. The previous solution, shifted
+    by one interval, is loaded as the starting point (used as a warm
+    start by solvers that support it). The last windows are padded with
+    zero demand, which is always feasible.
+    
+    Args:
+        demand_series: Demand per 15-minute interval (MW), any length
+        window: Look-ahead horizon in intervals
+        plants, batteries, dt: Unit data as in EconomicDispatchModel
+        solver: Solver name (None = persistent interface if available)
+        
+    Returns:
+        solution dict of the committed schedules (one value per
+        interval, same keys as solve_economic_dispatch, 'model' is None)
+        with the committed 'total_cost' and 'solve_times' (seconds per
+        window), or None if a window could not be solved
+    """
+    demand_series = list(demand_series)
+    num_steps = len(demand_series)
+    padded = demand_series + [0.0] * (window - 1)
+    
+    dispatch = EconomicDispatchModel(padded[:window], plants, batteries, dt, solver)
+    model = dispatch.model
+    warmstart = getattr(dispatch.solver, 'warm_start_capable', lambda: False)()
+    
+    plant_schedules = {g: {} for g in model.G}
+    battery_schedules = {b: {'p_charge': {}, 'p_discharge': {}, 'soc': {}} for b in model.B}
+    solve_times = []
+    total_cost = 0.0
+    
+    for step in range(1, num_steps + 1):
+        dispatch.update(demand=padded[step - 1:step - 1 + window])
+        
+        start = time.perf_counter()
+        if warmstart:
+            window_solution, result = dispatch.solve(warmstart=True)
+        else:
+            window_solution, result = dispatch.solve()
+        solve_times.append(time.perf_counter() - start)
+        
+        if window_solution is None:
+            print(f"\n⚠️  WARNING: Window starting at step {step} could not be solved!")
+            print(f"Solver Status: {result.solver.status}, "
+                  f"Termination Condition: {result.solver.termination_condition}")
+            return None
+        
+        # Commit the first interval
+        for g in model.G:
+            plant_schedules[g][step] = pyo.value(model.gen[g, 1])
+        for b in model.B:
+            for key in ('p_charge', 'p_discharge', 'soc'):
+                battery_schedules[b][key][step] = pyo.value(getattr(model, key)[b, 1])
+        total_cost += pyo.value(model.dt * (
+            sum(model.plant_cost[g] * model.gen[g, 1] for g in model.G) +
+            sum(model.bat_cost[b] * (model.p_charge[b, 1] + model.p_discharge[b, 1])
+                for b in model.B)))
+        
+        # Carry SoC forward and shift the solution as the next start point
+        dispatch.update(batteries={b: {'initial_soc': battery_schedules[b]['soc'][step]}
+                                   for b in model.B})
+        for var in (model.gen, model.p_charge, model.p_discharge, model.soc):
+            for unit, t in var:
+                if t < window:
+                    var[unit, t].set_value(pyo.value(var[unit, t + 1]))
+    
+    solution = _solution_dict(total_cost, plant_schedules, battery_schedules)
+    solution['solve_times'] = solve_times
+    return solution
+
+
+# Models built by the current sweep worker, keyed by problem structure
+_worker_models = {}
+
+
+def _solve_scenario(args):
+    """Solve one sweep scenario, reusing this worker's model and solver."""
+    index, scenario, solver = args
+    demand = DEFAULT_DEMAND if scenario.get('demand') is None else scenario['demand']
+    plants = unit_table(scenario.get('plants') or DEFAULT_PLANTS, PLANT_FIELDS)
+    batteries = unit_table(scenario.get('batteries') or DEFAULT_BATTERIES, BATTERY_FIELDS)
+    dt = scenario.get('dt', DEFAULT_DT)
+    
+    key = (len(demand), tuple(plants), tuple(batteries), solver)
+    start = time.perf_counter()
+    try:
+        dispatch = _worker_models.get(key)
+        if dispatch is None:
+            dispatch = EconomicDispatchModel(demand, plants, batteries, dt, solver)
+            _worker_models[key] = dispatch
+        else:
+            dispatch.update(demand, plants, batteries, dt)
+        solution, result = dispatch.solve(tee=False)
+        status = str(result.solver.termination_condition)
+    except Exception as error:
+        # One failing scenario must not abort the whole sweep; the model
+        # may be left half-updated, so build a fresh one next time
+        solution, status = None, f"error: {error}"
+        _worker_models.pop(key, None)
+    solve_time = time.perf_counter() - start
+    
+    record = {
+        'scenario': index,
+        'name': scenario.get('name', index),
+        'status': status,
+        'total_cost': np.nan,
+        'solve_time': solve_time,
+        'worker': os.getpid(),
+        'generation': None,
+        'p_charge': None,
+        'p_discharge': None,
+        'soc': None,
+    }
+    if solution is not None:
+        record['total_cost'] = solution['total_cost']
+        record['generation'] = np.array([list(s.values()) for s in solution['plants'].values()])
+        for field in ('p_charge', 'p_discharge', 'soc'):
+            record[field] = np.array([list(b[field].values())
+                                      for b in solution['batteries'].values()])
+    return record
+
+
+def sweep_economic_dispatch(scenarios, max_workers=None, solver=None, as_frame=False):
+    """
+    Solve many dispatch scenarios in parallel with a process pool.
+    
+    Each worker process keeps one EconomicDispatchModel (and solver) per
+    problem structure and only updates its Params between scenarios.
+    Solver output is suppressed (tee=False).
+    
+    Args:
+        scenarios: List of dicts with optional keys 'demand', 'plants',
+                   'batteries', 'dt' (as in EconomicDispatchModel) and 'name'
+        max_workers: Number of processes (None = os.cpu_count(), 1 = in-process)
+        solver: Solver name (None = persistent interface if available)
+        as_frame: Return a pandas DataFrame instead of a list of records
+        
+    Returns:
+        One record per scenario, in input order: 'scenario', 'name',
+        'status', 'total_cost', 'solve_time', 'worker' and the schedules
+        'generation' (G, T), 'p_charge', 'p_discharge', 'soc' (B, T).
+        Scenarios that are infeasible or fail keep their record with the
+        termination condition (or 'error: ...') as status, a NaN cost and
+        None schedules.
+    """
+    tasks = [(i, scenario, solver) for i, scenario in enumerate(scenarios)]
+    
+    if max_workers == 1:
+        records = [_solve_scenario(task) for task in tasks]
+    else:
+        max_workers = max_workers or os.cpu_count()
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            records = list(executor.map(_solve_scenario, tasks, chunksize=chunksize))
+    
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame.from_records(records, index='scenario')
+    return records
+
+
+def dispatch_cache_key(demand=None, plants=None, batteries=None, dt=DEFAULT_DT):
+    """Cache key over all inputs of the dispatch problem."""
+    demand = DEFAULT_DEMAND if demand is None else demand
+    plants = unit_table(DEFAULT_PLANTS if plants is None else plants, PLANT_FIELDS)
+    batteries = unit_table(DEFAULT_BATTERIES if batteries is None else batteries,
+                           BATTERY_FIELDS)
+    return SolutionCache.make_key('economic_dispatch', [float(d) for d in demand],
+                                  plants, batteries, float(dt))
+
+
+def solve_economic_dispatch(solver=None, demand=None, plants=None, batteries=None,
+                            cache=None):
+    # Identical inputs solved before: return the stored schedules
+    if cache is not None:
+        key = dispatch_cache_key(demand, plants, batteries)
+        solution = cache.get(key)
+        if solution is not None:
+            print(f"♻️  Loaded cached solution (Total Cost: {solution['total_cost']:.2f} €)")
+            return solution
+    
+    dispatch = EconomicDispatchModel(demand, plants, batteries, solver=solver)
+    model = dispatch.model
+    
     # ========================================================================
     # SOLVING THE OPTIMIZATION PROBLEM
     # ========================================================================
@@ -162,21 +622,15 @@ def solve_economic_dispatch():
     print("SOLVING ECONOMIC DISPATCH OPTIMIZATION")
     print("="*70)
     
-    # Create solver instance
-    solver = pyo.SolverFactory("glpk")  # Use GLPK LP solver
-    
     # Solve the model
-    result = solver.solve(model, tee=True)  # tee=True shows solver output
+    solution, result = dispatch.solve(tee=True)  # tee=True shows solver output
     
     # Check solver status
-    if result.solver.status != pyo.SolverStatus.ok:
+    if solution is None:
         print("\n⚠️  WARNING: Solver did not find optimal solution!")
         print(f"Solver Status: {result.solver.status}")
-        return None
-    
-    if result.solver.termination_condition != pyo.TerminationCondition.optimal:
-        print("\n⚠️  WARNING: Solution may not be optimal!")
         print(f"Termination Condition: {result.solver.termination_condition}")
+        return None
     
     # ========================================================================
     # EXTRACTING AND DISPLAYING RESULTS
@@ -192,18 +646,23 @@ def solve_economic_dispatch():
     print("\n" + "-"*70)
     print("TIME STEP SCHEDULE:")
     print("-"*70)
-    print(f"{'Time':>4} {'Demand':>8} {'PP1':>8} {'PP2':>8} "
-          f"{'Charge':>8} {'Disch':>8} {'SoC':>8}")
-    print(f"{'':>4} {'(MW)':>8} {'(MW)':>8} {'(MW)':>8} "
-          f"{'(MW)':>8} {'(MW)':>8} {'(MWh)':>8}")
+    header = f"{'Time':>4} {'Demand':>8}" + "".join(f" {g:>8}" for g in model.G)
+    units = f"{'':>4} {'(MW)':>8}" + " (MW)".rjust(9) * len(model.G)
+    for b in model.B:
+        header += f" {b + ' Chg':>10} {b + ' Dis':>10} {b + ' SoC':>10}"
+        units += f" {'(MW)':>10} {'(MW)':>10} {'(MWh)':>10}"
+    print(header)
+    print(units)
     print("-"*70)
     
     for t in model.T:
-        print(f"{t:4d} {pyo.value(model.demand[t]):8.2f} "
-              f"{pyo.value(model.g1[t]):8.2f} {pyo.value(model.g2[t]):8.2f} "
-              f"{pyo.value(model.p_charge[t]):8.2f} "
-              f"{pyo.value(model.p_discharge[t]):8.2f} "
-              f"{pyo.value(model.soc[t]):8.2f}")
+        row = f"{t:4d} {pyo.value(model.demand[t]):8.2f}"
+        row += "".join(f" {pyo.value(model.gen[g, t]):8.2f}" for g in model.G)
+        for b in model.B:
+            row += (f" {pyo.value(model.p_charge[b, t]):10.2f}"
+                    f" {pyo.value(model.p_discharge[b, t]):10.2f}"
+                    f" {pyo.value(model.soc[b, t]):10.2f}")
+        print(row)
     
     # Verify power balance
     print("\n" + "-"*70)
@@ -212,8 +671,9 @@ def solve_economic_dispatch():
     
     all_balanced = True
     for t in model.T:
-        supply = (pyo.value(model.g1[t]) + pyo.value(model.g2[t]) + 
-                 pyo.value(model.p_discharge[t]) - pyo.value(model.p_charge[t]))
+        supply = (sum(pyo.value(model.gen[g, t]) for g in model.G) +
+                  sum(pyo.value(model.p_discharge[b, t]) - pyo.value(model.p_charge[b, t])
+                      for b in model.B))
         demand = pyo.value(model.demand[t])
         balanced = abs(supply - demand) < 0.001  # Numerical tolerance
         status = "✅" if balanced else "❌"
@@ -229,15 +689,9 @@ def solve_economic_dispatch():
     # RETURNING SOLUTION
     # ========================================================================
     
-    solution = {
-        'total_cost': pyo.value(model.TotalCost),
-        'g1': {t: pyo.value(model.g1[t]) for t in model.T},
-        'g2': {t: pyo.value(model.g2[t]) for t in model.T},
-        'p_charge': {t: pyo.value(model.p_charge[t]) for t in model.T},
-        'p_discharge': {t: pyo.value(model.p_discharge[t]) for t in model.T},
-        'soc': {t: pyo.value(model.soc[t]) for t in model.T},
-        'model': model
-    }
+    if cache is not None:
+        # The Pyomo model itself is not stored
+        cache.put(key, {**solution, 'model': None})
     
     return solution
 
@@ -1,3 +1,11 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from solution_cache import SolutionCache
+
+
 class PlantAgent:
     """Power plant agent with private parameters."""
 
@@ -12,6 +20,44 @@ class PlantAgent:
         for t, target in demand_allocation.items():
             schedule[t] = min(target, self.capacity)
         return schedule, self.cost
+    
+    def respond_to_prices(self, target, rho, dt=0.25):
+        """
+        Best response to a price signal in the negotiation loop.
+        
+        argmin_x  dt*cost*x + ρ/2 ||x - target||²,  0 <= x <= capacity,
+        which is separable per time step with a closed-form solution.
+        """
+        return np.clip(np.asarray(target, dtype=float) - dt * self.cost / rho,
+                       0.0, self.capacity)
+
+
+def merit_order_allocation(demand, capacities):
+    """
+    Merit-order dispatch for all plants and time steps at once.
+    
+    With plants sorted by cost, plant p covers whatever demand is left
+    above the combined capacity of the cheaper plants:
+    
+        P[p, t] = clip(demand[t] - Σ_{q<p} capacity[q], 0, capacity[p])
+    
+    which equals filling the plants one after another with
+    min(remaining, capacity) for non-negative demand.
+    
+    Args:
+        demand: Demand per time step (T,)
+        capacities: Plant capacities in merit order (P,), or per time
+                    step (P, T)
+        
+    Returns:
+        schedules: Power per plant and time step (P, T)
+    """
+    demand = np.asarray(demand, dtype=float)
+    capacities = np.asarray(capacities, dtype=float)
+    if capacities.ndim == 1:
+        capacities = np.repeat(capacities[:, None], len(demand), axis=1)
+    capacity_before = np.cumsum(capacities, axis=0) - capacities
+    return np.clip(demand[None, :] - capacity_before, 0.0, capacities)
 
 
 class BatteryAgent:
@@ -22,8 +68,29 @@ class BatteryAgent:
         self.cost = cost  
         self.dt = 0.25
     
-    def propose_schedule(self, imbalances):
-        """Balance imbalances respecting constraints."""
+    def propose_schedule(self, imbalances, mode='greedy', plant_offers=None,
+                         soc_resolution=50, unmet_penalty=1000.0):
+        """
+        Balance imbalances respecting constraints.
+        
+        Args:
+            imbalances: {t: deficit (+) or surplus (-)} in MW
+            mode: 'greedy' forward pass, or 'lookahead' for the
+                  cost-optimal SoC trajectory over the whole horizon
+            plant_offers: Lookahead only, (scheduled, spare, prices) with
+                          scheduled plant output and spare plant capacity
+                          (P, T) in MW and prices (P,) in €/MWh sorted
+                          ascending. The battery may charge from spare
+                          capacity at the offered price, and discharge to
+                          replace scheduled output, saving its price
+            soc_resolution: Lookahead only, SoC grid steps per full-power
+                            time step
+            unmet_penalty: Lookahead only, €/MWh for unserved deficit
+        """
+        if mode == 'lookahead':
+            return self._propose_lookahead(imbalances, plant_offers,
+                                           soc_resolution, unmet_penalty)
+        
         charge_schedule = {}
         discharge_schedule = {}
         soc_schedule = {}
@@ -69,6 +136,157 @@ class BatteryAgent:
         return charge_schedule, discharge_schedule, soc_schedule, self.cost
 
 
+    def _soc_grid(self, soc_resolution):
+        """
+        SoC grid through the initial SoC and the allowed moves.
+        
+        The grid has spacing Δ = power_limit*dt / soc_resolution. A move of
+        m grid steps means charging (m > 0) or discharging (m < 0) at
+        m*Δ/dt MW.
+        
+        Returns:
+            grid (K,), index of the initial SoC, moves, charge and
+            discharge power per move
+        """
+        delta = self.power_limit * self.dt / soc_resolution
+        k_min = -int(np.floor(self.initial_soc / delta + 1e-9))
+        k_max = int(np.floor((self.capacity - self.initial_soc) / delta + 1e-9))
+        grid = self.initial_soc + delta * np.arange(k_min, k_max + 1)
+        
+        moves = np.arange(-soc_resolution, soc_resolution + 1)
+        power = moves * delta / self.dt
+        return grid, -k_min, moves, np.maximum(power, 0.0), np.maximum(-power, 0.0)
+    
+    def _soc_dp(self, stage_cost, soc_resolution):
+        """
+        Minimize Σ_t stage_cost[t, move] over feasible SoC trajectories.
+        
+        The stage cost of a move only depends on t, so each backward step
+        is one vectorized min over (SoC, move): O(T · K · soc_resolution).
+        The value of every successor SoC is read through a sliding window
+        over the inf-padded value vector, so a step allocates only the
+        (K, moves) total and no gather index or validity mask.
+        
+        Returns:
+            charge, discharge, soc along the optimal path, each (T,)
+        """
+        grid, k0, moves, charge, discharge = self._soc_grid(soc_resolution)
+        T, K = len(stage_cost), len(grid)
+        stage_cost = np.asarray(stage_cost, dtype=float)
+        
+        # Backward induction; successors[k, m] is the value at SoC k + moves[m]
+        padded = np.full(K + 2 * soc_resolution, np.inf)
+        value = padded[soc_resolution:soc_resolution + K]
+        value[:] = 0.0
+        successors = np.lib.stride_tricks.sliding_window_view(padded, len(moves))
+        rows = np.arange(K)
+        total = np.empty((K, len(moves)))
+        policy = np.empty((T, K), dtype=np.intp)
+        for t in range(T - 1, -1, -1):
+            np.add(stage_cost[t], successors, out=total)
+            policy[t] = np.argmin(total, axis=1)
+            value[:] = total[rows, policy[t]]
+        
+        # Forward pass from the initial SoC
+        path_moves = np.empty(T, dtype=np.intp)
+        k = k0
+        for t in range(T):
+            path_moves[t] = policy[t, k]
+            k += moves[path_moves[t]]
+        path_charge = charge[path_moves]
+        path_discharge = discharge[path_moves]
+        path_soc = grid[k0 + np.cumsum(moves[path_moves])]
+        
+        return path_charge, path_discharge, path_soc
+    
+    def _propose_lookahead(self, imbalances, plant_offers, soc_resolution,
+                           unmet_penalty):
+        """
+        Cost-optimal schedule by dynamic programming over a SoC grid.
+        
+        Stage cost: battery cost on charge + discharge, plus the offered
+        price for charging energy beyond the local surplus (cheapest spare
+        capacity first), minus the price of scheduled output replaced by
+        discharging beyond the deficit (most expensive first), plus
+        unmet_penalty for any deficit not covered.
+        """
+        steps = sorted(imbalances.keys())
+        T = len(steps)
+        dt = self.dt
+        imbalance = np.array([imbalances[t] for t in steps], dtype=float)
+        deficit = np.maximum(imbalance, 0.0)
+        surplus = np.maximum(-imbalance, 0.0)
+        
+        if plant_offers is None:
+            scheduled, spare, prices = np.zeros((0, T)), np.zeros((0, T)), np.zeros(0)
+        else:
+            scheduled, spare, prices = plant_offers
+            scheduled = np.asarray(scheduled, dtype=float).reshape(-1, T)
+            spare = np.asarray(spare, dtype=float).reshape(-1, T)
+            prices = np.asarray(prices, dtype=float)
+        _, _, moves, charge, discharge = self._soc_grid(soc_resolution)
+        
+        # Stage cost per (t, move). Charging energy beyond the surplus is
+        # bought from spare capacity cheapest first, discharging beyond the
+        # deficit replaces scheduled output most expensive first; both
+        # piecewise-linear curves are summed plant by plant over all
+        # (t, move) at once.
+        from_plants = np.maximum(charge[None, :] - surplus[:, None], 0.0)
+        replaced = np.maximum(discharge[None, :] - deficit[:, None], 0.0)
+        charge_cost = np.zeros((T, len(moves)))
+        saving = np.zeros((T, len(moves)))
+        spare_before = np.cumsum(spare, axis=0) - spare
+        sched_before = np.cumsum(scheduled[::-1], axis=0) - scheduled[::-1]
+        for p in range(len(prices)):
+            charge_cost += prices[p] * np.clip(from_plants - spare_before[p][:, None],
+                                               0.0, spare[p][:, None])
+            q = len(prices) - 1 - p
+            saving += prices[q] * np.clip(replaced - sched_before[p][:, None],
+                                          0.0, scheduled[q][:, None])
+        feasible = ((from_plants <= spare.sum(axis=0)[:, None] + 1e-9) &
+                    (replaced <= scheduled.sum(axis=0)[:, None] + 1e-9))
+        stage_cost = dt * (self.cost * (charge + discharge)[None, :] + charge_cost - saving +
+                           unmet_penalty * np.maximum(deficit[:, None] - discharge[None, :], 0.0))
+        stage_cost[~feasible] = np.inf
+        
+        path_charge, path_discharge, path_soc = self._soc_dp(stage_cost, soc_resolution)
+        
+        # Grid rounding can leave a deficit remainder below one grid step:
+        # cover it with energy the plan leaves unused (all later SoC stays >= 0)
+        for t in range(T):
+            if path_charge[t] > 0:
+                continue
+            extra = min(deficit[t] - path_discharge[t],
+                        self.power_limit - path_discharge[t],
+                        path_soc[t:].min() / dt)
+            if extra > 1e-9:
+                path_discharge[t] += extra
+                path_soc[t:] -= extra * dt
+        
+        charge_schedule = dict(zip(steps, path_charge.tolist()))
+        discharge_schedule = dict(zip(steps, path_discharge.tolist()))
+        soc_schedule = dict(zip(steps, np.maximum(path_soc, 0.0).tolist()))
+        
+        return charge_schedule, discharge_schedule, soc_schedule, self.cost
+    
+    def respond_to_prices(self, target, rho, soc_resolution=50):
+        """
+        Best response to a price signal in the negotiation loop.
+        
+        Minimizes dt*cost*(charge + discharge) + ρ/2 ||x - target||² over
+        the net output x = discharge - charge, subject to SoC limits.
+        
+        Returns:
+            charge, discharge, soc arrays (T,)
+        """
+        _, _, moves, charge, discharge = self._soc_grid(soc_resolution)
+        net = discharge - charge
+        target = np.asarray(target, dtype=float)
+        stage_cost = (self.dt * self.cost * (charge + discharge))[None, :] + \
+            0.5 * rho * (net[None, :] - target[:, None]) ** 2
+        return self._soc_dp(stage_cost, soc_resolution)
+
+
 class DistributedCoordinator:
     """Coordinator orchestrating distributed optimization."""
     
@@ -81,7 +299,35 @@ class DistributedCoordinator:
         self.best_solution = None
         self.best_cost = float('inf')
     
-    def run_optimization(self):
+    def cache_key(self):
+        """Cache key over the demand and all agent parameters."""
+        plants = sorted((p.plant_id, p.capacity, p.cost) for p in self.plant_agents)
+        battery = self.battery_agent
+        return SolutionCache.make_key(
+            'distributed_dispatch', [float(d) for d in self.demand], plants,
+            [battery.capacity, battery.power_limit, battery.initial_soc,
+             battery.cost, battery.dt])
+    
+    def run_optimization(self, cache=None, battery_mode='greedy'):
+        """
+        Merit-order plant dispatch followed by battery balancing.
+        
+        Args:
+            cache: Optional SolutionCache for repeated identical inputs
+            battery_mode: 'greedy', or 'lookahead' where the battery plans
+                          its whole SoC trajectory and may charge from the
+                          plants' spare capacity at their offered prices
+        """
+        if cache is not None:
+            key = SolutionCache.make_key(self.cache_key(), battery_mode)
+            cached = cache.get(key)
+            if cached is not None:
+                solution, cost = cached
+                self.best_solution = solution
+                self.best_cost = cost
+                print(f"\n♻️  Loaded cached solution cost: {cost:.2f} €")
+                return solution, cost
+        
         print("\n" + "="*70)
         print("DISTRIBUTED OPTIMIZATION")
         print("="*70)
@@ -107,36 +353,56 @@ class DistributedCoordinator:
             deficit = peak_demand - max_gen_capacity
             print(f"  ⚠️  Peak exceeds capacity by {deficit} MW - battery required!")
         
-        # Allocate demand intelligently
-        remaining_demand = {t: self.demand[t-1] for t in range(1, self.num_steps + 1)}
-        plant_schedules = []
+        # Allocate demand intelligently (all plants and time steps at once)
+        demand = np.asarray(self.demand, dtype=float)
+        schedules = merit_order_allocation(demand, [p.capacity for p in sorted_plants])
+        remaining = demand - schedules.sum(axis=0)
+        steps = range(1, self.num_steps + 1)
+        remaining_demand = dict(zip(steps, remaining.tolist()))
         
         print("\nAllocating to plants...")
-        for plant in sorted_plants:
-            schedule, cost = plant.propose_schedule(remaining_demand)
-            
-            # Update remaining
-            for t in remaining_demand:
-                remaining_demand[t] -= schedule[t]
-            
-            total_gen = sum(schedule.values()) * 0.25
+        for plant, schedule in zip(sorted_plants, schedules):
+            total_gen = schedule.sum() * 0.25
             print(f"  Plant {plant.plant_id}: {total_gen:.2f} MWh")
-            
-            plant_schedules.append({
-                'id': f'PP{plant.plant_id}',
-                'schedule': schedule,
-                'cost': cost
-            })
         
         # Show what battery needs to do
         print("\nBattery balancing...")
-        total_deficit = sum(max(0, d) for d in remaining_demand.values())
-        total_surplus = sum(abs(min(0, d)) for d in remaining_demand.values())
+        total_deficit = np.maximum(remaining, 0).sum()
+        total_surplus = np.abs(np.minimum(remaining, 0)).sum()
         print(f"  Total deficit: {total_deficit:.2f} MW (needs discharge)")
         print(f"  Total surplus: {total_surplus:.2f} MW (can charge)")
         
         # Battery balances
-        charge, discharge, soc, bat_cost = self.battery_agent.propose_schedule(remaining_demand)
+        if battery_mode == 'lookahead':
+            # Plants offer spare capacity and scheduled output at their cost
+            spare = np.array([p.capacity for p in sorted_plants])[:, None] - schedules
+            prices = np.array([p.cost for p in sorted_plants])
+            charge, discharge, soc, bat_cost = self.battery_agent.propose_schedule(
+                remaining_demand, mode='lookahead',
+                plant_offers=(schedules, spare, prices))
+            
+            # Charging beyond the surplus is produced by the plants (merit
+            # order), discharging beyond the deficit replaces the most
+            # expensive scheduled output
+            charge_vec = np.array([charge[t] for t in steps])
+            discharge_vec = np.array([discharge[t] for t in steps])
+            from_plants = np.maximum(charge_vec - np.maximum(-remaining, 0.0), 0.0)
+            replaced = np.maximum(discharge_vec - np.maximum(remaining, 0.0), 0.0)
+            schedules = (schedules + merit_order_allocation(from_plants, spare)
+                         - merit_order_allocation(replaced, schedules[::-1])[::-1])
+            print(f"  Lookahead charging from plants: {from_plants.sum() * 0.25:.2f} MWh")
+            print(f"  Lookahead plant output replaced: {replaced.sum() * 0.25:.2f} MWh")
+        else:
+            charge, discharge, soc, bat_cost = self.battery_agent.propose_schedule(remaining_demand)
+        
+        plant_schedules = [
+            {
+                'id': f'PP{plant.plant_id}',
+                'schedule': dict(zip(steps, schedule.tolist())),
+                'cost': plant.cost
+            }
+            for plant, schedule in zip(sorted_plants, schedules)
+        ]
         
         battery_schedule = {
             'charge': charge,
@@ -158,8 +424,132 @@ class DistributedCoordinator:
         
         print(f"\n✅ Solution cost: {cost:.2f} €")
         
+        if cache is not None:
+            cache.put(key, (solution, cost))
+        
         return solution, cost
     
+    def run_negotiation(self, max_rounds=200, rho=1.0, tol=1e-2,
+                        soc_resolution=50, max_workers=None, verbose=True):
+        """
+        Iterative price-signal negotiation (exchange ADMM).
+        
+        Each round the coordinator broadcasts the mean imbalance x̄ and the
+        scaled price u; every agent answers with its best response to the
+        target x_i - x̄ - u (in parallel, agents only see their own data),
+        then u += x̄. The price λ = -ρ·u/dt converges to the marginal cost
+        in €/MWh.
+        
+        After every round a feasible schedule is recovered (battery as
+        proposed, plants cover the rest in merit order) and the cheapest
+        one is kept in best_solution.
+        
+        Args:
+            max_rounds: Round cap (at least 1)
+            rho: ADMM penalty (€/MW² per round)
+            tol: Stop when the mismatch Σx - demand and the change of the
+                 agents' proposals are both below tol (MW)
+            soc_resolution: Battery SoC grid resolution
+            max_workers: Threads for the agents' responses (None = one per agent)
+            verbose: Print a per-round summary every 10 rounds
+        
+        Returns:
+            best_solution, best_cost, history dict with per-round
+            'mismatch', 'change', 'cost', 'price' and 'round_time'
+        """
+        if max_rounds < 1:
+            raise ValueError(f"max_rounds must be at least 1, got {max_rounds}")
+        
+        demand = np.asarray(self.demand, dtype=float)
+        sorted_plants = sorted(self.plant_agents, key=lambda p: p.cost)
+        capacities = [p.capacity for p in sorted_plants]
+        battery = self.battery_agent
+        steps = range(1, self.num_steps + 1)
+        n = len(sorted_plants) + 2  # plants, battery and the fixed demand
+        
+        # Start from the merit-order schedule with an idle battery
+        plant_x = merit_order_allocation(demand, capacities)
+        battery_x = np.zeros(self.num_steps)
+        u = np.zeros(self.num_steps)
+        
+        history = {'mismatch': [], 'change': [], 'cost': [], 'price': [],
+                   'round_time': []}
+        self.best_solution = None
+        self.best_cost = float('inf')
+        
+        if verbose:
+            print("\n" + "="*70)
+            print("PRICE-SIGNAL NEGOTIATION")
+            print("="*70)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or n - 1) as pool:
+            for k in range(max_rounds):
+                start = time.perf_counter()
+                x_bar = (plant_x.sum(axis=0) + battery_x - demand) / n
+                
+                # Agents respond to their own target in parallel
+                plant_jobs = [
+                    pool.submit(plant.respond_to_prices, x - x_bar - u, rho, battery.dt)
+                    for plant, x in zip(sorted_plants, plant_x)
+                ]
+                battery_job = pool.submit(battery.respond_to_prices,
+                                          battery_x - x_bar - u, rho, soc_resolution)
+                new_plant_x = np.array([job.result() for job in plant_jobs])
+                charge, discharge, soc = battery_job.result()
+                new_battery_x = discharge - charge
+                
+                change = max(np.abs(new_plant_x - plant_x).max(),
+                             np.abs(new_battery_x - battery_x).max())
+                plant_x, battery_x = new_plant_x, new_battery_x
+                mismatch = plant_x.sum(axis=0) + battery_x - demand
+                u += mismatch / n
+                
+                # Primal recovery: plants cover what the battery leaves
+                schedules = merit_order_allocation(demand - battery_x, capacities)
+                feasible = np.allclose(schedules.sum(axis=0) + battery_x, demand,
+                                       atol=1e-6)
+                solution = {
+                    'plants': [
+                        {
+                            'id': f'PP{plant.plant_id}',
+                            'schedule': dict(zip(steps, schedule.tolist())),
+                            'cost': plant.cost
+                        }
+                        for plant, schedule in zip(sorted_plants, schedules)
+                    ],
+                    'battery': {
+                        'charge': dict(zip(steps, charge.tolist())),
+                        'discharge': dict(zip(steps, discharge.tolist())),
+                        'soc': dict(zip(steps, soc.tolist())),
+                        'cost': battery.cost
+                    }
+                }
+                cost = self._calculate_cost(solution) if feasible else float('inf')
+                if cost < self.best_cost:
+                    self.best_solution = solution
+                    self.best_cost = cost
+                
+                history['mismatch'].append(float(np.abs(mismatch).max()))
+                history['change'].append(float(change))
+                history['cost'].append(cost)
+                history['price'].append(-rho * u / battery.dt)
+                history['round_time'].append(time.perf_counter() - start)
+                
+                if verbose and k % 10 == 0:
+                    print(f"  Round {k:3d}: mismatch {history['mismatch'][-1]:7.3f} MW, "
+                          f"cost {cost:9.2f} €, {history['round_time'][-1]*1e3:6.2f} ms")
+                
+                if history['mismatch'][-1] <= tol and change <= tol:
+                    break
+        
+        if verbose:
+            print(f"\n✅ Negotiation stopped after {k + 1} rounds "
+                  f"(mismatch {history['mismatch'][-1]:.4f} MW)")
+            print(f"   Best recovered cost: {self.best_cost:.2f} €")
+            print(f"   Mean round time: {np.mean(history['round_time'])*1e3:.2f} ms")
+        
+        return self.best_solution, self.best_cost, history
+    
     def _calculate_cost(self, solution):
         """Calculate total cost."""
         dt = 0.25
@@ -177,8 +567,14 @@ class DistributedCoordinator:
         
         return total
     
-    def display_results(self):
-        """Display comprehensive results."""
+    def display_results(self, optimal_cost=1754.0):
+        """
+        Display comprehensive results.
+        
+        Args:
+            optimal_cost: Centralized optimum to compare against (the
+                          Pyomo result for the default problem)
+        """
         print("\n" + "="*70)
         print("RESULTS & ANALYSIS")
         print("="*70)
@@ -187,9 +583,9 @@ class DistributedCoordinator:
         
         print(f"\n📊 Cost Comparison:")
         print(f"   MAS Solution:  {self.best_cost:8.2f} €")
-        print(f"   Pyomo Optimal:  1,754.00 €")
+        print(f"   Pyomo Optimal: {optimal_cost:9,.2f} €")
         
-        gap = ((self.best_cost - 1754.0) / 1754.0) * 100
+        gap = ((self.best_cost - optimal_cost) / optimal_cost) * 100
         print(f"   Difference: {gap:+7.2f}%")
         
         if -0.5 < gap < 0:
@@ -311,6 +707,18 @@ def main():
     # Display
     coordinator.display_results()
     
+    # Iterative price negotiation (same agents, fresh coordinator)
+    negotiator = DistributedCoordinator(
+        demand=demand,
+        plant_agents=[plant2, plant1],
+        battery_agent=battery
+    )
+    _, negotiated_cost, history = negotiator.run_negotiation(rho=2.0)
+    print(f"   Cleared price (€/MWh): "
+          f"{np.array2string(history['price'][-1], precision=1)}")
+    print(f"   Negotiated cost: {negotiated_cost:.2f} € "
+          f"in {len(history['cost'])} rounds")
+    
     print("\n" + "="*70)
     print("SUMMARY")
     print("="*70)
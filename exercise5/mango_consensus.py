@@ -0,0 +1,321 @@
+"""
+Message-passing consensus on mango containers.
+
+Each ConsensusAgent only knows its own value and its neighbors' values,
+and updates
+
+    x_i(k+1) = x_i(k) - α Σ_j L_ij x_j(k)
+
+which is one row of x(k+1) = (I - αL) x(k) from tast2.py. Values travel
+through one ConsensusRouter per container: everything the local agents
+publish in the same event-loop tick is coalesced into a single message
+per destination container, and values for agents in the same container
+are handed over by reference.
+
+With max_staleness=0 the agents run in lockstep and reproduce the matrix
+iteration exactly; with max_staleness=s an agent may run up to s rounds
+ahead of its slowest neighbor, using the latest value it has. Stale
+values would break the symmetry of the exchange (and delayed Laplacian
+steps can diverge), so asynchronous agents run push-sum instead: each
+agent holds a mass s_i (initially x_i) and a weight w_i (initially 1),
+sends the share β_i·(-L_ij) of both to every neighbor j, who adds it on
+arrival, and keeps the rest, with β_i = min(α, 2/(3 L_ii)). Nothing is
+created or lost, so Σ s_i stays the initial sum once all shares are
+delivered, and the estimates x_i = s_i / w_i converge to the exact
+initial average for any bounded delay.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from mango import Agent, activate, create_tcp_container
+
+from tast2 import create_ring_laplacian, discrete_consensus, optimal_step_size
+
+
+class ConsensusRouter(Agent):
+    """
+    Per-container message batcher for consensus values.
+    
+    Local agents call publish(); the first publish in a tick schedules a
+    flush, which delivers local values directly and sends one message
+    per remote container with all values addressed to its agents.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.local_agents = {}     # node -> ConsensusAgent
+        self.remote_routers = {}   # node -> AgentAddress of its router
+        self._pending = []
+        self._flush_scheduled = False
+        
+        # Traffic counters
+        self.messages_sent = 0
+        self.values_sent = 0
+    
+    def publish(self, node, round_index, value, receivers, shares=None):
+        """
+        Queue node's value of round round_index for its receivers.
+        
+        shares optionally maps each receiver to the (mass, weight) share
+        node pushed to it.
+        """
+        for receiver in receivers:
+            share = None if shares is None else shares[receiver]
+            self._pending.append((receiver, node, round_index, value, share))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+    
+    def _flush(self):
+        """Deliver local values, send one batch per remote container."""
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+        
+        batches = {}
+        for receiver, node, round_index, value, share in pending:
+            if receiver in self.local_agents:
+                self.local_agents[receiver].receive_value(node, round_index, value, share)
+            else:
+                router = self.remote_routers[receiver]
+                batches.setdefault(router, []).append(
+                    [receiver, node, round_index, value, share])
+        
+        for router, values in batches.items():
+            self.schedule_instant_message({'consensus_batch': values}, router)
+            self.messages_sent += 1
+            self.values_sent += len(values)
+    
+    def handle_message(self, content, meta):
+        for receiver, node, round_index, value, share in content['consensus_batch']:
+            self.local_agents[receiver].receive_value(node, round_index, value, share)
+
+
+class ConsensusAgent(Agent):
+    """
+    Consensus participant exchanging values with its neighbors only.
+    
+    Neighbor values are kept per round, so an update of round k uses the
+    neighbors' round-k values in lockstep mode and the latest value at or
+    before round k otherwise. Asynchronous agents run push-sum (see the
+    module docstring) and are only done once every neighbor's shares
+    for all rounds have arrived.
+    """
+    
+    def __init__(self, node, value, weights, alpha, num_rounds, max_staleness=0):
+        """
+        Args:
+            node: Node index in the topology
+            value: Initial value x_i(0)
+            weights: {neighbor node: L_ij} for the neighbors j != i
+            alpha: Step size
+            num_rounds: Number of updates to perform
+            max_staleness: How many rounds a neighbor's latest value may
+                           lag behind (0 = lockstep)
+        """
+        super().__init__()
+        self.node = node
+        self.value = float(value)
+        self.weights = weights
+        self.degree = -sum(weights.values())   # L_ii
+        self.alpha = alpha
+        self.num_rounds = num_rounds
+        self.max_staleness = max_staleness
+        self.router = None
+        
+        self.round = 0
+        self.history = [self.value]
+        self.neighbor_values = {j: {} for j in weights}
+        self.done_event = asyncio.Event()
+        
+        # Asynchronous mode: push-sum mass and weight, shares received
+        # but not yet added
+        self.mass = self.value
+        self.weight = 1.0
+        self.inflow = [0.0, 0.0]
+        self.shares_received = 0
+    
+    def start(self):
+        """Publish the initial value (called once all containers run)."""
+        self.router.publish(self.node, 0, self.value, self.weights)
+        self._advance()
+    
+    def receive_value(self, node, round_index, value, share=None):
+        self.neighbor_values[node][round_index] = value
+        if share is not None:
+            self.inflow[0] += share[0]
+            self.inflow[1] += share[1]
+            self.shares_received += 1
+        self._advance()
+    
+    def _neighbor_value(self, j):
+        """Value of neighbor j to use for the current round (None = wait)."""
+        values = self.neighbor_values[j]
+        if self.round in values:
+            return values[self.round]
+        known = [r for r in values if r <= self.round]
+        if not known or max(known) < self.round - self.max_staleness:
+            return None
+        return values[max(known)]
+    
+    def _advance(self):
+        """Perform every update for which enough neighbor values are known."""
+        while self.round < self.num_rounds:
+            neighbor_values = {j: self._neighbor_value(j) for j in self.weights}
+            if any(v is None for v in neighbor_values.values()):
+                return
+            
+            if self.max_staleness == 0:
+                shares = None
+                self.value -= self.alpha * (
+                    self.degree * self.value +
+                    sum(w * neighbor_values[j] for j, w in self.weights.items()))
+            else:
+                # Keep at least a third of the mass: pushing nearly all of
+                # it (α close to 1/degree) makes delayed shares oscillate
+                step = min(self.alpha, 2.0 / (3.0 * self.degree)) if self.weights else 0.0
+                shares = {j: (-step * w * self.mass, -step * w * self.weight)
+                          for j, w in self.weights.items()}
+                keep = 1.0 - step * self.degree
+                self._absorb(keep * self.mass, keep * self.weight)
+            self.round += 1
+            self.history.append(self.value)
+            
+            # Values older than the staleness window are no longer needed
+            oldest = self.round - self.max_staleness
+            for values in self.neighbor_values.values():
+                for r in [r for r in values if r < oldest and r != max(values)]:
+                    del values[r]
+            
+            self.router.publish(self.node, self.round, self.value, self.weights, shares)
+        
+        if self.max_staleness > 0:
+            # Shares arriving after the last round still belong to the sum
+            self._absorb(self.mass, self.weight)
+            self.history[-1] = self.value
+            if self.shares_received < self.num_rounds * len(self.weights):
+                return
+        self.done_event.set()
+    
+    def _absorb(self, mass, weight):
+        """Push-sum: add the received shares to the kept (mass, weight)."""
+        self.mass = mass + self.inflow[0]
+        self.weight = weight + self.inflow[1]
+        self.inflow = [0.0, 0.0]
+        self.value = self.mass / self.weight
+
+
+def neighbor_weights(L):
+    """Off-diagonal Laplacian entries per node: [{j: L_ij}, ...]."""
+    L = sp.csr_matrix(L)
+    weights = []
+    for i in range(L.shape[0]):
+        row = L.getrow(i)
+        weights.append({int(j): float(v) for j, v in zip(row.indices, row.data)
+                        if j != i and v != 0})
+    return weights
+
+
+async def run_mango_consensus(x0, L, alpha, num_rounds, num_containers=2,
+                              max_staleness=0, host='127.0.0.1', base_port=5555):
+    """
+    Run consensus with one mango agent per node.
+    
+    Nodes are split into num_containers contiguous blocks, one TCP
+    container each, so only the edges between blocks cross containers.
+    
+    Args:
+        x0: Initial values (N,)
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
+        alpha: Step size
+        num_rounds: Number of updates per agent
+        num_containers: Number of containers the agents are spread over
+        max_staleness: 0 for lockstep rounds, s > 0 for asynchronous
+                       push-sum with neighbors up to s rounds behind
+                       (converges to the exact average, but is not the
+                       matrix iteration)
+        host, base_port: Address of the first container (ports count up)
+    
+    Returns:
+        dict with 'x' (N,) final values, 'history' (num_rounds+1, N),
+        'wall_time', 'messages' (inter-container messages) and
+        'values_sent' (neighbor values carried by them)
+    """
+    x0 = np.asarray(x0, dtype=float)
+    N = len(x0)
+    weights = neighbor_weights(L)
+    blocks = np.array_split(np.arange(N), num_containers)
+    
+    containers = [create_tcp_container((host, base_port + c))
+                  for c in range(num_containers)]
+    routers = [container.register(ConsensusRouter()) for container in containers]
+    agents = [None] * N
+    for container, router, block in zip(containers, routers, blocks):
+        for i in block:
+            agent = container.register(ConsensusAgent(
+                int(i), x0[i], weights[i], alpha, num_rounds, max_staleness))
+            agent.router = router
+            router.local_agents[int(i)] = agent
+            agents[i] = agent
+    for router in routers:
+        for other, block in zip(routers, blocks):
+            if other is not router:
+                router.remote_routers.update({int(i): other.addr for i in block})
+    
+    async with activate(*containers):
+        start = time.perf_counter()
+        for agent in agents:
+            agent.start()
+        await asyncio.gather(*(agent.done_event.wait() for agent in agents))
+        wall_time = time.perf_counter() - start
+    
+    return {
+        'x': np.array([agent.value for agent in agents]),
+        'history': np.array([agent.history for agent in agents]).T,
+        'wall_time': wall_time,
+        'messages': sum(router.messages_sent for router in routers),
+        'values_sent': sum(router.values_sent for router in routers)
+    }
+
+
+async def main():
+    """Main function."""
+    
+    N = 20
+    num_rounds = 100
+    rng = np.random.default_rng(0)
+    x0 = rng.uniform(0, 100, N)
+    L, _, _ = create_ring_laplacian(N)
+    alpha, _ = optimal_step_size(L)
+    
+    print("\n" + "="*70)
+    print("MANGO CONSENSUS (MESSAGE PASSING)")
+    print("="*70)
+    print(f"   Agents: {N} (ring), rounds: {num_rounds}, α = {alpha:.3f}")
+    print(f"   Initial average: {np.mean(x0):.4f}")
+    
+    reference = discrete_consensus(x0, L, alpha, num_rounds)[-1]
+    
+    for num_containers, max_staleness in [(1, 0), (2, 0), (4, 0), (4, 2)]:
+        result = await run_mango_consensus(x0, L, alpha, num_rounds,
+                                           num_containers=num_containers,
+                                           max_staleness=max_staleness)
+        mode = "lockstep" if max_staleness == 0 else f"async (staleness {max_staleness})"
+        print(f"\n📦 {num_containers} container(s), {mode}:")
+        print(f"   Wall time: {result['wall_time']*1e3:.1f} ms")
+        print(f"   Inter-container messages: {result['messages']} "
+              f"({result['values_sent']} neighbor values)")
+        print(f"   Final spread: {np.ptp(result['x']):.2e}, "
+              f"average: {np.mean(result['x']):.4f}")
+        if max_staleness == 0:
+            print(f"   Max deviation from matrix iteration: "
+                  f"{np.max(np.abs(result['x'] - reference)):.2e}")
+        else:
+            print(f"   Max error vs initial average: "
+                  f"{np.max(np.abs(result['x'] - np.mean(x0))):.2e}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -77,6 +77,112 @@ class GeneratorAgent:
         return self.P, self.lambda_val
 
 
+class GeneratorFleet:
+    """
+    Array-backed fleet of generators.
+    
+    Holds a, b, P_min, P_max, λ and P of all generators as NumPy arrays,
+    so one update of the whole fleet is a handful of vectorized operations
+    instead of a Python loop over GeneratorAgent objects. The arithmetic
+    is the same as in GeneratorAgent, element by element.
+    """
+    
+    def __init__(self, a, b, P_min, P_max, agents=None):
+        self.a = np.asarray(a, dtype=float)
+        N = len(self.a)
+        self.b = np.broadcast_to(np.asarray(b, dtype=float), (N,)).copy()
+        self.P_min = np.broadcast_to(np.asarray(P_min, dtype=float), (N,)).copy()
+        self.P_max = np.broadcast_to(np.asarray(P_max, dtype=float), (N,)).copy()
+        
+        # State variables
+        self.lambda_val = np.zeros(N)
+        self.P = np.zeros(N)
+        
+        # Optional GeneratorAgent objects mirrored by sync_agents()
+        self.agents = agents
+    
+    @classmethod
+    def from_agents(cls, agents):
+        """Build a fleet from a list of GeneratorAgent objects."""
+        fleet = cls([agent.a for agent in agents],
+                    [agent.b for agent in agents],
+                    [agent.P_min for agent in agents],
+                    [agent.P_max for agent in agents],
+                    agents=agents)
+        fleet.lambda_val = np.array([agent.lambda_val for agent in agents], dtype=float)
+        fleet.P = np.array([agent.P for agent in agents], dtype=float)
+        return fleet
+    
+    def __len__(self):
+        return len(self.a)
+    
+    def compute_power_from_lambda(self, lambda_vec):
+        """P = clip((λ - b) / (2*a), P_min, P_max) for all generators."""
+        P = (lambda_vec - self.b) / (2 * self.a)
+        return np.clip(P, self.P_min, self.P_max)
+    
+    def compute_lambda_from_power(self, P):
+        """λ = 2*a*P + b for all generators."""
+        return 2 * self.a * P + self.b
+    
+    def update_power(self, lambda_consensus, rho, P_target, N):
+        """Vectorized GeneratorAgent.update_power for the whole fleet."""
+        penalty_correction = rho * (self.P - P_target / N)
+        lambda_adjusted = lambda_consensus + penalty_correction
+        
+        self.P = self.compute_power_from_lambda(lambda_adjusted)
+        self.lambda_val = self.compute_lambda_from_power(self.P)
+        
+        return self.P, self.lambda_val
+    
+    def sync_agents(self):
+        """Write the fleet state back to the GeneratorAgent views."""
+        if self.agents is None:
+            return
+        for i, agent in enumerate(self.agents):
+            agent.lambda_val = self.lambda_val[i]
+            agent.P = self.P[i]
+
+
+def _as_fleet(agents):
+    """Accept a GeneratorFleet or a list of GeneratorAgent objects."""
+    if isinstance(agents, GeneratorFleet):
+        return agents
+    return GeneratorFleet.from_agents(agents)
+
+
+def make_rng(rng=None):
+    """
+    Normalize a random source for the simulation entry points.
+    
+    Args:
+        rng: numpy Generator (used as is), integer seed or SeedSequence
+             (new Generator), or None (the global np.random state, so
+             np.random.seed() keeps working as before)
+    """
+    if rng is None or rng is np.random:
+        return np.random
+    if isinstance(rng, (np.random.Generator, np.random.RandomState)):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn_rngs(seed, n):
+    """
+    Independent, reproducible random streams for n parallel workers.
+    
+    Args:
+        seed: Integer seed or SeedSequence for the whole sweep
+        n: Number of workers
+        
+    Returns:
+        List of n numpy Generators with non-overlapping streams
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(n)]
+
+
 def create_ring_laplacian(N):
     """Create Laplacian for ring topology."""
     A = np.zeros((N, N))
@@ -92,57 +198,298 @@ def create_ring_laplacian(N):
 
 
 def distributed_economic_dispatch(agents, L, P_target, alpha=0.3, rho=0.5, 
-                                  num_iterations=50):
+                                  num_iterations=50, lambda_tol=None,
+                                  power_tol=None, check_every=1,
+                                  return_info=False, lambda_init=None,
+                                  rng=None):
     """
     Solve economic dispatch using distributed consensus.
     
     Args:
-        agents: List of GeneratorAgent objects
+        agents: List of GeneratorAgent objects, or a GeneratorFleet
         L: Laplacian matrix
         P_target: Total power demand
         alpha: Consensus step size
         rho: Penalty term weight
-        num_iterations: Number of iterations
+        num_iterations: Maximum number of iterations
+        lambda_tol: Stop once the λ spread max(λ) - min(λ) <= lambda_tol
+        power_tol: Stop once |Σ P - P_target| <= power_tol
+        check_every: Test the stopping criteria every k iterations
+        return_info: Also return an info dict (see below)
+        lambda_init: Initial λ values (N,) for a warm start
+                     (None = random in [15, 20])
+        rng: numpy Generator or seed for the random initial λ
+             (None = global np.random state)
+        
+    When both tolerances are given, both must hold to stop early.
         
     Returns:
         lambda_history: Incremental costs over time
         power_history: Power outputs over time
+        info (only with return_info): dict with 'iterations' used,
+            'converged' flag and per-iteration residual arrays
+            'lambda_spread' and 'power_mismatch'
     """
-    N = len(agents)
+    if check_every < 1:
+        raise ValueError(f"check_every must be >= 1, got {check_every}")
+    
+    fleet = _as_fleet(agents)
+    N = len(fleet)
     
     # Initialize histories
     lambda_history = np.zeros((num_iterations + 1, N))
     power_history = np.zeros((num_iterations + 1, N))
+    lambda_spread = np.zeros(num_iterations + 1)
+    power_mismatch = np.zeros(num_iterations + 1)
     
-    # Initialize with random λ values
-    for i, agent in enumerate(agents):
-        agent.lambda_val = np.random.uniform(15, 20)
-        agent.P = agent.compute_power_from_lambda(agent.lambda_val)
-        lambda_history[0, i] = agent.lambda_val
-        power_history[0, i] = agent.P
+    # Initialize with random λ values (or warm start)
+    if lambda_init is None:
+        fleet.lambda_val = make_rng(rng).uniform(15, 20, size=N)
+    else:
+        fleet.lambda_val = np.broadcast_to(np.asarray(lambda_init, dtype=float), (N,)).copy()
+    fleet.P = fleet.compute_power_from_lambda(fleet.lambda_val)
+    lambda_history[0] = fleet.lambda_val
+    power_history[0] = fleet.P
+    lambda_spread[0] = np.ptp(fleet.lambda_val)
+    power_mismatch[0] = abs(np.sum(fleet.P) - P_target)
+    
+    check = lambda_tol is not None or power_tol is not None
+    converged = False
     
     # Weight matrix for consensus
     W = np.eye(N) - alpha * L
     
     # Iterations
-    for t in range(num_iterations):
+    t = 0
+    while t < num_iterations:
         # Step 1: Consensus on incremental costs
-        lambda_vec = np.array([agent.lambda_val for agent in agents])
-        lambda_vec = W @ lambda_vec  # Consensus update
+        lambda_vec = W @ fleet.lambda_val  # Consensus update
         
-        # Step 2: Each agent updates power based on consensus λ
-        for i, agent in enumerate(agents):
-            lambda_consensus = lambda_vec[i]
-            agent.update_power(lambda_consensus, rho, P_target, N)
+        # Step 2: All agents update power based on consensus λ
+        fleet.update_power(lambda_vec, rho, P_target, N)
+        t += 1
         
         # Record
-        for i, agent in enumerate(agents):
-            lambda_history[t + 1, i] = agent.lambda_val
-            power_history[t + 1, i] = agent.P
+        lambda_history[t] = fleet.lambda_val
+        power_history[t] = fleet.P
+        lambda_spread[t] = np.ptp(fleet.lambda_val)
+        power_mismatch[t] = abs(np.sum(fleet.P) - P_target)
+        
+        # Stopping criteria
+        if check and t % check_every == 0:
+            converged = ((lambda_tol is None or lambda_spread[t] <= lambda_tol) and
+                         (power_tol is None or power_mismatch[t] <= power_tol))
+            if converged:
+                break
+    
+    fleet.sync_agents()
+    
+    lambda_history = lambda_history[:t + 1]
+    power_history = power_history[:t + 1]
+    
+    if return_info:
+        info = {
+            'iterations': t,
+            'converged': converged,
+            'lambda_spread': lambda_spread[:t + 1],
+            'power_mismatch': power_mismatch[:t + 1]
+        }
+        return lambda_history, power_history, info
     
     return lambda_history, power_history
 
 
+def multi_period_dispatch(agents, L, P_targets, alpha=0.3, rho=0.5,
+                          num_iterations=50, lambda_tol=None, power_tol=None,
+                          check_every=1, warm_start=True, batched=False,
+                          lambda_init=None, rng=None):
+    """
+    Solve distributed economic dispatch for a series of demand targets.
+    
+    Sequential mode solves the periods in order; with warm_start each
+    period starts from the converged λ of the previous one instead of a
+    random guess. Batched mode advances all periods together as (K, N)
+    arrays, one matrix product per iteration; periods that meet the
+    stopping criteria are frozen, so each row matches its own
+    single-period run from the same initial λ.
+    
+    Args:
+        agents: List of GeneratorAgent objects, or a GeneratorFleet
+        L: Laplacian matrix
+        P_targets: Total power demand per period (K,)
+        alpha, rho, num_iterations, lambda_tol, power_tol, check_every:
+            As in distributed_economic_dispatch
+        warm_start: Start each period from the previous λ (sequential only)
+        batched: Solve all periods at once as a batched array computation
+        lambda_init: Initial λ (N,) for the first period, or for every
+                     period in batched mode (None = random in [15, 20])
+        rng: numpy Generator or seed for the random initial λ
+             (None = global np.random state)
+        
+    Returns:
+        dict with 'lambda' and 'P' (K, N) final values per period,
+        'iterations' (K,) and 'converged' (K,)
+    """
+    if check_every < 1:
+        raise ValueError(f"check_every must be >= 1, got {check_every}")
+    
+    fleet = _as_fleet(agents)
+    N = len(fleet)
+    rng = make_rng(rng)
+    P_targets = np.asarray(P_targets, dtype=float)
+    K = len(P_targets)
+    
+    if not batched:
+        lambda_final = np.zeros((K, N))
+        P_final = np.zeros((K, N))
+        iterations = np.zeros(K, dtype=int)
+        converged = np.zeros(K, dtype=bool)
+        
+        lambda_start = lambda_init
+        for k in range(K):
+            lambda_history, power_history, info = distributed_economic_dispatch(
+                fleet, L, P_targets[k], alpha, rho, num_iterations,
+                lambda_tol, power_tol, check_every, return_info=True,
+                lambda_init=lambda_start, rng=rng
+            )
+            lambda_final[k] = lambda_history[-1]
+            P_final[k] = power_history[-1]
+            iterations[k] = info['iterations']
+            converged[k] = info['converged']
+            if warm_start:
+                lambda_start = lambda_final[k]
+        
+        return {
+            'lambda': lambda_final,
+            'P': P_final,
+            'iterations': iterations,
+            'converged': converged
+        }
+    
+    # Batched: rows are periods, the fleet methods broadcast over them
+    if lambda_init is None:
+        lambda_init = rng.uniform(15, 20, size=N)
+    Lam = np.tile(np.broadcast_to(np.asarray(lambda_init, dtype=float), (N,)), (K, 1))
+    P = fleet.compute_power_from_lambda(Lam)
+    targets = P_targets[:, None]
+    
+    W = np.eye(N) - alpha * L
+    check = lambda_tol is not None or power_tol is not None
+    active = np.ones(K, dtype=bool)
+    iterations = np.zeros(K, dtype=int)
+    
+    for t in range(1, num_iterations + 1):
+        # Consensus and power update for all still-active periods
+        lambda_vec = Lam[active] @ W.T
+        P_prev = P[active]
+        penalty_correction = rho * (P_prev - targets[active] / N)
+        P_new = fleet.compute_power_from_lambda(lambda_vec + penalty_correction)
+        Lam[active] = fleet.compute_lambda_from_power(P_new)
+        P[active] = P_new
+        iterations[active] = t
+        
+        # Stopping criteria, per period
+        if check and t % check_every == 0:
+            done = np.ones(K, dtype=bool)
+            if lambda_tol is not None:
+                done &= np.ptp(Lam, axis=1) <= lambda_tol
+            if power_tol is not None:
+                done &= np.abs(np.sum(P, axis=1) - P_targets) <= power_tol
+            active &= ~done
+            if not np.any(active):
+                break
+    
+    converged = ~active if check else np.zeros(K, dtype=bool)
+    
+    return {
+        'lambda': Lam,
+        'P': P,
+        'iterations': iterations,
+        'converged': converged
+    }
+
+
+def solve_dispatch_exact(agents, P_target):
+    """
+    Exact centralized economic dispatch by breakpoint sorting.
+    
+    Total output P(λ) = Σ clip((λ - b_i) / (2*a_i), P_min_i, P_max_i) is
+    piecewise linear and non-decreasing in λ, with breakpoints where a
+    generator leaves P_min (λ = 2*a*P_min + b) or hits P_max
+    (λ = 2*a*P_max + b). Sorting the 2N breakpoints and accumulating the
+    slopes gives P(λ) at every breakpoint, so the root of
+    P(λ) = P_target is found in O(N log N).
+    
+    Args:
+        agents: List of GeneratorAgent objects, or a GeneratorFleet
+        P_target: Total power demand
+        
+    Returns:
+        lambda_opt: Optimal incremental cost
+        P_opt: Optimal power outputs (N,)
+        cost_opt: Optimal total cost Σ a*P² + b*P
+    """
+    fleet = _as_fleet(agents)
+    P_low, P_high = np.sum(fleet.P_min), np.sum(fleet.P_max)
+    if not P_low - 1e-9 <= P_target <= P_high + 1e-9:
+        raise ValueError(f"P_target={P_target} outside feasible range "
+                         f"[{P_low}, {P_high}]")
+    
+    # Breakpoints and the slope change at each of them
+    slope = 1.0 / (2 * fleet.a)
+    breakpoints = np.concatenate([fleet.compute_lambda_from_power(fleet.P_min),
+                                  fleet.compute_lambda_from_power(fleet.P_max)])
+    slope_change = np.concatenate([slope, -slope])
+    order = np.argsort(breakpoints, kind='stable')
+    breakpoints = breakpoints[order]
+    slope_after = np.cumsum(slope_change[order])
+    
+    # Total power at each breakpoint
+    total = P_low + np.concatenate([[0.0], np.cumsum(slope_after[:-1] * np.diff(breakpoints))])
+    
+    # First breakpoint where the target is reached, interpolate before it
+    j = np.searchsorted(total, P_target)
+    if j == 0:
+        lambda_opt = breakpoints[0]
+    elif j == len(total):
+        lambda_opt = breakpoints[-1]
+    else:
+        lambda_opt = breakpoints[j - 1] + (P_target - total[j - 1]) / slope_after[j - 1]
+    
+    P_opt = fleet.compute_power_from_lambda(lambda_opt)
+    cost_opt = np.sum(fleet.a * P_opt**2 + fleet.b * P_opt)
+    
+    return lambda_opt, P_opt, cost_opt
+
+
+def optimality_gap(agents, P, P_target):
+    """
+    Compare a dispatch P against the exact optimum.
+    
+    Args:
+        agents: List of GeneratorAgent objects, or a GeneratorFleet
+        P: Power outputs to evaluate (N,)
+        P_target: Total power demand
+        
+    Returns:
+        dict with 'cost', 'cost_opt', 'gap' (relative), 'mismatch'
+        (Σ P - P_target), 'lambda_opt' and 'P_opt'
+    """
+    fleet = _as_fleet(agents)
+    P = np.asarray(P, dtype=float)
+    lambda_opt, P_opt, cost_opt = solve_dispatch_exact(fleet, P_target)
+    cost = np.sum(fleet.a * P**2 + fleet.b * P)
+    
+    return {
+        'cost': cost,
+        'cost_opt': cost_opt,
+        'gap': (cost - cost_opt) / abs(cost_opt) if cost_opt != 0 else cost - cost_opt,
+        'mismatch': np.sum(P) - P_target,
+        'lambda_opt': lambda_opt,
+        'P_opt': P_opt
+    }
+
+
 def plot_results(lambda_history, power_history, agents, P_target):
     """Plot convergence of λ and P."""
     num_iterations, N = lambda_history.shape
@@ -192,8 +539,8 @@ def plot_results(lambda_history, power_history, agents, P_target):
     return fig
 
 
-def main():
-    """Main function."""
+def main(seed=None):
+    """Main function (seed makes the random initial λ reproducible)."""
     
     print("\n" + "="*70)
     print("DISTRIBUTED ECONOMIC DISPATCH USING CONSENSUS")
@@ -243,7 +590,7 @@ def main():
     
     # Run algorithm
     lambda_history, power_history = distributed_economic_dispatch(
-        agents, L, P_target, alpha, rho, num_iterations
+        agents, L, P_target, alpha, rho, num_iterations, rng=seed
     )
     
     # Analyze results
@@ -287,6 +634,14 @@ def main():
     else:
         print(f"   → ⚠️  Some variation remains (near-optimal)")
     
+    # Exact reference (λ-bisection by breakpoint sorting)
+    reference = optimality_gap(agents, power_history[-1], P_target)
+    print(f"\n🎯 Exact Reference Dispatch:")
+    print(f"   Optimal λ:    {reference['lambda_opt']:.6f} €/MWh")
+    print(f"   Optimal cost: {reference['cost_opt']:.4f} €")
+    print(f"   Consensus cost gap: {reference['gap']*100:+.4f}% "
+          f"(power mismatch {reference['mismatch']:+.4f} MW)")
+    
     # Plot
     print(f"\n📈 Generating plots...")
     fig = plot_results(lambda_history, power_history, agents, P_target)
@@ -1,8 +1,27 @@
+import hashlib
+from collections import OrderedDict
+
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 import matplotlib.pyplot as plt
 
 
-def create_ring_laplacian(N):
+# Above this many agents the CSR path is used automatically
+SPARSE_THRESHOLD = 1000
+
+# Relative tolerance of the sparse λ_N estimate (see laplacian_extreme_eigenvalues)
+LAMBDA_MAX_RTOL = 1e-3
+
+
+def _use_sparse(N, sparse):
+    """Resolve the sparse flag (None = decide by size)."""
+    if sparse is None:
+        return N >= SPARSE_THRESHOLD
+    return sparse
+
+
+def create_ring_laplacian(N, sparse=None):
     """
     Create Laplacian matrix for ring topology.
     
@@ -10,28 +29,181 @@ def create_ring_laplacian(N):
     
     Args:
         N: Number of nodes
+        sparse: Build CSR matrices instead of dense arrays
+                (None = automatic, sparse for N >= SPARSE_THRESHOLD)
         
     Returns:
-        L: Laplacian matrix (N x N)
+        L, A, D: Laplacian, adjacency and degree matrices (N x N)
     """
-    # Adjacency matrix for ring
-    A = np.zeros((N, N))
-    for i in range(N):
-        # Connect to next neighbor (with wraparound)
-        j = (i + 1) % N
-        A[i, j] = 1
-        A[j, i] = 1 
+    i = np.arange(N)
+    j = (i + 1) % N  # Connect to next neighbor (with wraparound)
+    return create_laplacian(N, np.column_stack([i, j]), sparse=sparse)
+
+
+def create_laplacian(N, edges, sparse=None):
+    """
+    Create Laplacian matrix for an arbitrary undirected topology.
+    
+    Args:
+        N: Number of nodes
+        edges: Iterable of (i, j) node pairs, one per communication link
+        sparse: Build CSR matrices instead of dense arrays
+                (None = automatic, sparse for N >= SPARSE_THRESHOLD)
+        
+    Returns:
+        L, A, D: Laplacian, adjacency and degree matrices (N x N)
+    """
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    
+    # Adjacency matrix (duplicate links collapse to a single edge)
+    A = sp.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(N, N)).tocsr()
+    A.data[:] = 1.0
     
     # Degree matrix
-    D = np.diag(np.sum(A, axis=1))
+    D = sp.diags(np.asarray(A.sum(axis=1)).ravel(), format='csr')
     
     # Laplacian
-    L = D - A
+    L = (D - A).tocsr()
     
+    if not _use_sparse(N, sparse):
+        return L.toarray(), A.toarray(), D.toarray()
     return L, A, D
 
 
-def discrete_consensus(x0, L, alpha, num_iterations):
+def consensus_weight_matrix(L, alpha):
+    """
+    Build W = I - α*L, keeping the storage format of L.
+    
+    For a CSR Laplacian W has the same sparsity pattern, so one
+    update W @ x costs O(edges) instead of O(N²).
+    """
+    N = L.shape[0]
+    if sp.issparse(L):
+        return (sp.identity(N, format='csr') - alpha * L).tocsr()
+    return np.eye(N) - alpha * L
+
+
+def laplacian_extreme_eigenvalues(L):
+    """
+    Compute λ₂ (algebraic connectivity) and λ_N (largest eigenvalue) of L.
+    
+    Dense Laplacians use a full symmetric eigendecomposition. Sparse ones
+    use Lanczos (eigsh): shift-invert just below zero for λ₂, and for λ_N
+    a loose relative tolerance LAMBDA_MAX_RTOL. The top of the spectrum is
+    tightly clustered on large graphs (a ring has λ_N - λ_{N-1} = O(1/N²)),
+    so a tight tolerance there costs minutes. The Ritz value is raised by
+    the tolerance and capped at the Gershgorin bound 2·max_degree, so the
+    result stays an upper bound and α = 2/(λ₂ + λ_N) remains convergent.
+    
+    Returns:
+        (lambda_2, lambda_N)
+    """
+    N = L.shape[0]
+    if N < 2:
+        return 0.0, 0.0
+    if not sp.issparse(L) or N < 3:
+        eigvals = np.linalg.eigvalsh(L.toarray() if sp.issparse(L) else L)
+        return float(eigvals[1]), float(eigvals[-1])
+    
+    L = sp.csc_matrix(L, dtype=float)
+    gershgorin = 2.0 * L.diagonal().max()
+    try:
+        ritz = spla.eigsh(L, k=1, which='LA', tol=LAMBDA_MAX_RTOL, maxiter=10 * N,
+                          return_eigenvectors=False)[0]
+        lambda_N = min(ritz * (1.0 + LAMBDA_MAX_RTOL), gershgorin)
+    except spla.ArpackNoConvergence:
+        lambda_N = gershgorin
+    # L is singular, so shift slightly below 0 for the factorization
+    smallest = spla.eigsh(L, k=2, sigma=-1e-6, which='LM', tol=1e-10,
+                          maxiter=10 * N, return_eigenvectors=False)
+    lambda_2 = np.max(smallest)
+    return float(max(lambda_2, 0.0)), float(lambda_N)
+
+
+def optimal_step_size(L):
+    """
+    Step size with the fastest worst-case convergence: α* = 2/(λ₂ + λ_N).
+    
+    Returns:
+        alpha: Optimal step size
+        rate: Contraction factor per iteration, (λ_N - λ₂)/(λ_N + λ₂)
+    """
+    lambda_2, lambda_N = laplacian_extreme_eigenvalues(L)
+    if lambda_N <= 0:
+        return 0.0, 1.0
+    alpha = 2.0 / (lambda_2 + lambda_N)
+    rate = (lambda_N - lambda_2) / (lambda_N + lambda_2)
+    return alpha, rate
+
+
+def predict_iterations(L, alpha=None, tolerance=1e-3, initial_error=1.0):
+    """
+    Predict (worst case) iterations until the disagreement is below tolerance.
+    
+    The disagreement contracts by ρ(α) = max(|1 - αλ₂|, |1 - αλ_N|)
+    per iteration, so k = ceil(log(tolerance/initial_error) / log ρ).
+    
+    Args:
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
+        alpha: Step size (None = optimal_step_size)
+        tolerance: Target error
+        initial_error: Initial disagreement, e.g. max |x0 - mean(x0)|
+        
+    Returns:
+        iterations: Predicted number of iterations (inf if not converging)
+        alpha: Step size the prediction was made for
+    """
+    lambda_2, lambda_N = laplacian_extreme_eigenvalues(L)
+    if alpha is None:
+        if lambda_N <= 0:
+            return (0 if initial_error <= tolerance else np.inf), 0.0
+        alpha = 2.0 / (lambda_2 + lambda_N)
+    
+    rate = max(abs(1 - alpha * lambda_2), abs(1 - alpha * lambda_N))
+    if initial_error <= tolerance:
+        return 0, alpha
+    if rate >= 1.0:
+        return np.inf, alpha
+    if rate == 0.0:
+        return 1, alpha
+    iterations = int(np.ceil(np.log(tolerance / initial_error) / np.log(rate)))
+    return iterations, alpha
+
+
+def iter_consensus(x0, L, alpha, num_iterations=None, tolerance=None):
+    """
+    Generate consensus states one iteration at a time.
+    
+    Nothing but the current state is kept in memory, so this is the
+    streaming counterpart of discrete_consensus for long runs.
+    
+    Args:
+        x0: Initial states (N,)
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
+        alpha: Step size
+        num_iterations: Maximum number of iterations (None = unbounded)
+        tolerance: Stop once the spread max(x) - min(x) <= tolerance
+        
+    Yields:
+        (t, x): Iteration index and state vector, starting with (0, x0)
+    """
+    W = consensus_weight_matrix(L, alpha)
+    
+    x = np.array(x0, dtype=float)
+    t = 0
+    yield t, x
+    while num_iterations is None or t < num_iterations:
+        if tolerance is not None and np.max(x) - np.min(x) <= tolerance:
+            return
+        x = W @ x
+        t += 1
+        yield t, x
+
+
+def discrete_consensus(x0, L, alpha, num_iterations, tolerance=None,
+                       store_every=1, callback=None):
     """
     Run discrete-time consensus algorithm.
     
@@ -39,26 +211,189 @@ def discrete_consensus(x0, L, alpha, num_iterations):
     
     Args:
         x0: Initial states (N,)
-        L: Laplacian matrix (N, N)
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
         alpha: Step size
-        num_iterations: Number of iterations
+        num_iterations: Maximum number of iterations
+        tolerance: Stop early once the spread max(x) - min(x) <= tolerance
+        store_every: Keep only every k-th state in the history
+                     (the final state is always kept)
+        callback: Optional function callback(t, x) called every iteration
         
     Returns:
-        history: Array of states over time (num_iterations+1, N)
+        history: Array of states over time (num_iterations+1, N), shorter
+                 when stopping early or thinning with store_every
+    """
+    if store_every < 1:
+        raise ValueError(f"store_every must be >= 1, got {store_every}")
+    
+    # Snapshots are collected as they come, so an early stop only pays
+    # for the states actually stored
+    history = []
+    for t, x in iter_consensus(x0, L, alpha, num_iterations, tolerance):
+        if callback is not None:
+            callback(t, x)
+        if t % store_every == 0:
+            history.append(x)
+    
+    # Always keep the final state
+    if t % store_every != 0:
+        history.append(x)
+    
+    return np.array(history)
+
+
+class SpectralConsensus:
     """
-    N = len(x0)
-    history = np.zeros((num_iterations + 1, N))
-    history[0] = x0
+    Closed-form consensus states via the eigendecomposition of W.
     
-    # Weight matrix
-    W = np.eye(N) - alpha * L
+    W = I - α*L is symmetric, so W = V diag(μ) Vᵀ and
+    x(k) = V diag(μᵏ) Vᵀ x0. After the one-off O(N³) decomposition any
+    iteration k costs O(N²), independent of k.
+    """
     
-    # Iterate
-    x = x0.copy()
-    for t in range(num_iterations):
-        x = W @ x
-        history[t + 1] = x
+    def __init__(self, L, alpha):
+        L_dense = L.toarray() if sp.issparse(L) else np.asarray(L, dtype=float)
+        self.alpha = alpha
+        self.eigvals, self.eigvecs = np.linalg.eigh(
+            np.eye(L_dense.shape[0]) - alpha * L_dense)
+    
+    def state_at(self, x0, k):
+        """
+        State after k iterations.
+        
+        Args:
+            x0: Initial states (N,)
+            k: Iteration index, or array of indices
+            
+        Returns:
+            x: State (N,), or (len(k), N) for an array of indices
+        """
+        coeffs = self.eigvecs.T @ np.asarray(x0, dtype=float)
+        k = np.asarray(k)
+        powers = self.eigvals ** k[..., None]
+        return (powers * coeffs) @ self.eigvecs.T
+
+
+# Decompositions reused across calls, keyed by (shape, sha256 of L, α)
+# and stored together with L in CSR form. Least recently used entries
+# are evicted once the cache holds more than SPECTRAL_CACHE_BYTES.
+_spectral_cache = OrderedDict()
+SPECTRAL_CACHE_BYTES = 256 * 2**20
+
+# Largest N for consensus_state_at: the decomposition is a dense O(N³)
+# eigh with two N×N float64 matrices (3.2 GB at N = 20000)
+SPECTRAL_MAX_N = 4000
+
+
+def _csr_parts(L):
+    """Arrays that fully describe a canonical CSR matrix."""
+    return L.indptr, L.indices, L.data
+
+
+def consensus_state_at(x0, L, alpha, k):
+    """
+    Jump straight to iteration k of discrete_consensus.
+    
+    Matches discrete_consensus(x0, L, alpha, k)[-1] without iterating;
+    the decomposition of W is cached per topology and α.
     
+    Args:
+        x0: Initial states (N,)
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
+        alpha: Step size
+        k: Iteration index, or array of indices
+        
+    Returns:
+        x: State (N,), or (len(k), N) for an array of indices
+    
+    Raises:
+        ValueError: If N > SPECTRAL_MAX_N (use discrete_consensus instead)
+    """
+    N = L.shape[0]
+    if N > SPECTRAL_MAX_N:
+        raise ValueError(
+            f"consensus_state_at needs a dense eigendecomposition, N = {N} exceeds "
+            f"SPECTRAL_MAX_N = {SPECTRAL_MAX_N}; use discrete_consensus instead")
+    
+    # Canonical CSR, so sparse inputs are hashed without densifying
+    L_csr = sp.csr_matrix(L, dtype=float)
+    L_csr.sum_duplicates()
+    L_csr.sort_indices()
+    parts = _csr_parts(L_csr)
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(np.ascontiguousarray(part).tobytes())
+    key = (L_csr.shape, digest.hexdigest(), float(alpha))
+    
+    # The stored Laplacian is compared on a hit, so a digest collision
+    # can never return states of a different topology
+    cached = _spectral_cache.get(key)
+    if cached is not None and all(
+            np.array_equal(a, b) for a, b in zip(_csr_parts(cached[0]), parts)):
+        _spectral_cache.move_to_end(key)
+        return cached[1].state_at(x0, k)
+    
+    propagator = SpectralConsensus(L_csr, alpha)
+    size = (sum(part.nbytes for part in parts) + propagator.eigvals.nbytes +
+            propagator.eigvecs.nbytes)
+    if size <= SPECTRAL_CACHE_BYTES:
+        _spectral_cache.pop(key, None)
+        while _spectral_cache and (
+                sum(entry[2] for entry in _spectral_cache.values()) + size
+                > SPECTRAL_CACHE_BYTES):
+            _spectral_cache.popitem(last=False)
+        _spectral_cache[key] = (L_csr, propagator, size)
+    
+    return propagator.state_at(x0, k)
+
+
+def batched_consensus(X0, L, alpha, num_iterations, summary=False):
+    """
+    Run discrete-time consensus for many scenarios at once.
+
+    All scenarios share the topology, so the update for the whole batch
+    is one matrix-matrix product per iteration:
+
+        X(t+1) = X(t) - α * X(t) L      (L symmetric)
+
+    Args:
+        X0: Initial states, one scenario per row (S, N)
+        L: Laplacian matrix (N, N), dense array or scipy.sparse matrix
+        alpha: Step size, scalar or one value per scenario (S,)
+        num_iterations: Number of iterations
+        summary: If True, return a reduced summary instead of the history
+
+    Returns:
+        history: Array of states over time (num_iterations+1, S, N), or
+        summary dict with 'final_states' (S, N), 'consensus' (S,) and
+        'errors' (num_iterations+1, S) = max |x_i - mean(x0)| per step
+    """
+    X = np.array(X0, dtype=float, ndmin=2)
+    S, N = X.shape
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (S,))[:, None]
+    consensus_value = X.mean(axis=1)
+
+    if summary:
+        errors = np.zeros((num_iterations + 1, S))
+        errors[0] = np.max(np.abs(X - consensus_value[:, None]), axis=1)
+    else:
+        history = np.zeros((num_iterations + 1, S, N))
+        history[0] = X
+
+    # Iterate (L @ X.T keeps sparse L on the left for scipy)
+    for t in range(num_iterations):
+        X = X - alpha * (L @ X.T).T
+        if summary:
+            errors[t + 1] = np.max(np.abs(X - consensus_value[:, None]), axis=1)
+        else:
+            history[t + 1] = X
+
+    if summary:
+        return {
+            'final_states': X,
+            'consensus': consensus_value,
+            'errors': errors
+        }
     return history
 
 
@@ -113,11 +448,11 @@ def analyze_convergence(history, x0, tolerance=1e-3):
     print(f"\nConvergence status: {'✅ CONVERGED' if converged else '❌ NOT CONVERGED'}")
     print(f"Maximum error from consensus: {max_error:.6e}")
     
-    # Find when consensus reached (within tolerance)
-    for t in range(num_iterations):
-        if np.allclose(history[t], consensus_value, atol=tolerance):
-            print(f"Consensus reached at iteration: {t}")
-            break
+    # Find when consensus reached (within tolerance), one vectorized pass
+    abs_errors = np.abs(history - consensus_value)
+    within = np.all(abs_errors <= tolerance + 1e-5 * abs(consensus_value), axis=1)
+    if np.any(within):
+        print(f"Consensus reached at iteration: {np.argmax(within)}")
     
     # Verify sum preservation (Laplacian property)
     initial_sum = np.sum(x0)
@@ -128,7 +463,7 @@ def analyze_convergence(history, x0, tolerance=1e-3):
     print(f"  Difference:  {abs(initial_sum - final_sum):.6e}")
     
     # Convergence rate
-    errors = np.max(np.abs(history - consensus_value), axis=1)
+    errors = np.max(abs_errors, axis=1)
     print(f"\nConvergence rate:")
     print(f"  Initial error: {errors[0]:.6f}")
     print(f"  Final error:   {errors[-1]:.6e}")
@@ -155,7 +490,7 @@ def main():
     print(f"   Iterations: {num_iterations}")
     
     # Create ring Laplacian
-    L, A, D = create_ring_laplacian(N)
+    L, A, D = create_ring_laplacian(N, sparse=False)
     
     print(f"\n🔗 Communication Topology:")
     print(f"   Adjacency Matrix:")
@@ -178,6 +513,15 @@ def main():
     print(f"   Stability bound: 0 < α < {alpha_max:.3f}")
     print(f"   Chosen α: {alpha}")
     
+    # Spectral prediction (fastest α = 2/(λ₂ + λ_N))
+    alpha_opt, rate_opt = optimal_step_size(L)
+    initial_error = np.max(np.abs(x0 - np.mean(x0)))
+    k_chosen, _ = predict_iterations(L, alpha, 1e-3, initial_error)
+    k_opt, _ = predict_iterations(L, alpha_opt, 1e-3, initial_error)
+    print(f"   Optimal α (spectral): {alpha_opt:.4f} (rate {rate_opt:.4f})")
+    print(f"   Predicted iterations to 1e-3: {k_chosen} (chosen α), "
+          f"{k_opt} (optimal α)")
+    
     # Run consensus
     print(f"\n🔄 Running consensus algorithm...")
     history = discrete_consensus(x0, L, alpha, num_iterations)